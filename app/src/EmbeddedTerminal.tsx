@@ -2,6 +2,7 @@ import { useEffect, useRef } from 'react'
 import { Terminal } from 'xterm'
 import { FitAddon } from '@xterm/addon-fit'
 import 'xterm/css/xterm.css'
+import { decodeBase64ToBytes } from './terminalUtils'
 
 type TerminalChannel = 'main' | 'review' | 'droid' | 'codex'
 
@@ -10,14 +11,8 @@ interface EmbeddedTerminalProps {
   tabId?: string  // Required for 'droid' and 'codex' channels
 }
 
-function decodeBase64ToBytes(base64: string): Uint8Array {
-  const binary = window.atob(base64)
-  const bytes = new Uint8Array(binary.length)
-  for (let i = 0; i < binary.length; i += 1) {
-    bytes[i] = binary.charCodeAt(i)
-  }
-  return bytes
-}
+// Window for coalescing main-terminal keystrokes into one native message
+const INPUT_BATCH_MS = 4
 
 export function EmbeddedTerminal({ channel = 'main', tabId }: EmbeddedTerminalProps) {
   const termRef = useRef<HTMLDivElement>(null)
@@ -91,19 +86,37 @@ export function EmbeddedTerminal({ channel = 'main', tabId }: EmbeddedTerminalPr
       return true
     })
 
+    // ─── Main-channel input batching ───
+    let pendingInput = ''
+    let inputTimer: number | null = null
+    // Anything else writing to the main PTY must call this first so queued
+    // keystrokes can't be overtaken by a later paste or bridge command.
+    const flushInput = () => {
+      if (inputTimer !== null) {
+        clearTimeout(inputTimer)
+        inputTimer = null
+      }
+      if (!pendingInput) return
+      const data = pendingInput
+      pendingInput = ''
+      if (window.webkit?.messageHandlers?.terminalInput) {
+        window.webkit.messageHandlers.terminalInput.postMessage(data)
+      }
+    }
+
     // ─── Channel-specific Input/Output ───
     if (channel === 'main') {
       // Keyboard Input → Native PTY (main)
-      term.onData((data) => {
-        if (window.webkit?.messageHandlers?.terminalInput) {
-          window.webkit.messageHandlers.terminalInput.postMessage(data)
-        }
-      })
-      term.onBinary((data) => {
-        if (window.webkit?.messageHandlers?.terminalInput) {
-          window.webkit.messageHandlers.terminalInput.postMessage(data)
-        }
-      })
+      // Coalesce input within a short window so fast typing / per-char paste
+      // events reach the native side as one message instead of N.
+      const queueInput = (data: string) => {
+        pendingInput += data
+        if (inputTimer !== null) return
+        inputTimer = window.setTimeout(flushInput, INPUT_BATCH_MS)
+      }
+      term.onData(queueInput)
+      term.onBinary(queueInput)
+      window.__flushTerminalInput = flushInput
       // Receive Output from Native PTY (main)
       window.__onTerminalOutput = (text: string) => {
         term.write(text)
@@ -180,15 +193,22 @@ export function EmbeddedTerminal({ channel = 'main', tabId }: EmbeddedTerminalPr
       }
     }
 
+    // A drag fires many observer callbacks per frame; fit (which forces layout) once per frame
+    let fitFrame: number | null = null
     const handleResize = () => {
       if (resizeTimerRef.current) {
         clearTimeout(resizeTimerRef.current)
       }
 
-      try {
-        fitAddon.fit()
-      } catch (e) {
-        console.error('fit error:', e)
+      if (fitFrame === null) {
+        fitFrame = requestAnimationFrame(() => {
+          fitFrame = null
+          try {
+            fitAddon.fit()
+          } catch (e) {
+            console.error('fit error:', e)
+          }
+        })
       }
 
       resizeTimerRef.current = window.setTimeout(() => {
@@ -233,6 +253,7 @@ export function EmbeddedTerminal({ channel = 'main', tabId }: EmbeddedTerminalPr
           navigator.clipboard.readText().then(text => {
             const wrapped = `\x1b[200~${text}\x1b[201~`
             if (channel === 'main') {
+              flushInput()
               if (window.webkit?.messageHandlers?.terminalInput) {
                 window.webkit.messageHandlers.terminalInput.postMessage(wrapped)
               }
@@ -261,7 +282,14 @@ export function EmbeddedTerminal({ channel = 'main', tabId }: EmbeddedTerminalPr
       if (resizeTimerRef.current) {
         clearTimeout(resizeTimerRef.current)
       }
+      if (fitFrame !== null) {
+        cancelAnimationFrame(fitFrame)
+      }
+      flushInput()
       if (channel === 'main') {
+        if (window.__flushTerminalInput === flushInput) {
+          window.__flushTerminalInput = undefined
+        }
         window.__onTerminalOutput = undefined
         window.__onTerminalOutputBytes = undefined
       } else if ((channel === 'droid' || channel === 'codex') && tabId) {
@@ -2,21 +2,13 @@ import { useEffect, useRef } from 'react'
 import { Terminal } from 'xterm'
 import { FitAddon } from '@xterm/addon-fit'
 import { CloseIcon } from './Icons'
+import { decodeBase64ToBytes } from './terminalUtils'
 
 interface ReviewTerminalProps {
   projectPath?: string
   onClose: () => void
 }
 
-function decodeBase64ToBytes(base64: string): Uint8Array {
-  const binary = window.atob(base64)
-  const bytes = new Uint8Array(binary.length)
-  for (let i = 0; i < binary.length; i += 1) {
-    bytes[i] = binary.charCodeAt(i)
-  }
-  return bytes
-}
-
 export function ReviewTerminal({ projectPath, onClose }: ReviewTerminalProps) {
   const termRef = useRef<HTMLDivElement>(null)
   const xtermRef = useRef<Terminal | null>(null)
@@ -0,0 +1,15 @@
+// Native base64 decoder (Safari 18.2+ / macOS 15.2+); not yet in the TS DOM lib
+const nativeFromBase64 = (Uint8Array as unknown as {
+  fromBase64?: (base64: string) => Uint8Array
+}).fromBase64
+
+/** Decode a base64 PTY chunk from the native bridge into bytes for xterm.js. */
+export function decodeBase64ToBytes(base64: string): Uint8Array {
+  if (nativeFromBase64) return nativeFromBase64(base64)
+  const binary = window.atob(base64)
+  const bytes = new Uint8Array(binary.length)
+  for (let i = 0; i < binary.length; i += 1) {
+    bytes[i] = binary.charCodeAt(i)
+  }
+  return bytes
+}
@@ -48,6 +48,7 @@ declare global {
     }
     __onTerminalOutput?: (data: string) => void
     __onTerminalOutputBytes?: (base64Data: string) => void
+    __flushTerminalInput?: () => void
     __onHookNotify?: (data: any) => void
     __onCreateAutoFixWorkers?: (data: any) => void
     __onDismissConfirmationCard?: (data: any) => void
@@ -10,7 +10,9 @@ import os
 import pty
 import re
 import select
+import selectors
 import signal
+import socket
 import struct
 import fcntl
 import termios
@@ -18,7 +20,10 @@ import threading
 import subprocess
 import json
 import base64
+import codecs
+import copy
 import time
+from collections import deque
 from autofix_logic import (
     is_codex_turn_complete,
     extract_codex_final_message,
@@ -26,12 +31,12 @@ from autofix_logic import (
     filter_p0p1_items,
     decide_autofix_next,
 )
-import urllib.request
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
 
 import objc
-from Foundation import NSURL, NSURLRequest, NSOperationQueue, NSMakeRange, NSAttributedString
+from Foundation import NSURL, NSURLRequest, NSOperationQueue, NSMakeRange, NSMutableAttributedString, NSDictionary
 from AppKit import NSForegroundColorAttributeName, NSFontAttributeName
 from Cocoa import (
     NSApplication,
@@ -67,20 +72,83 @@ from WebKit import WKWebView, WKWebViewConfiguration, WKUserContentController, W
 # ─── Config Persistence ─────────────────────────────────────────────
 
 CONFIG_PATH = os.path.expanduser('~/.openspec_desktop.json')
+CONFIG_SAVE_DELAY = 0.2  # Debounce window for coalescing config writes
+
+# In-memory copy of the config file. The file is only re-read when its mtime
+# changes (i.e. it was edited outside this process); writes are debounced.
+_config_cache = None
+_config_mtime = 0.0
+_config_lock = threading.Lock()
+_config_save_timer = None
+
+def _refresh_config_cache():
+    """Load the config file into the cache if needed. Caller holds _config_lock."""
+    global _config_cache, _config_mtime
+    try:
+        mtime = os.stat(CONFIG_PATH).st_mtime
+    except OSError:
+        mtime = 0.0
+    # A pending write means the cache is newer than the file on disk
+    if _config_cache is None or (_config_save_timer is None and mtime != _config_mtime):
+        try:
+            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+                _config_cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            _config_cache = {}
+        _config_mtime = mtime
 
 def load_config() -> dict:
-    try:
-        with open(CONFIG_PATH, 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+    with _config_lock:
+        _refresh_config_cache()
+        return copy.deepcopy(_config_cache)
+
+def _schedule_config_flush():
+    """(Re)start the debounced write. Caller holds _config_lock."""
+    global _config_save_timer
+    if _config_save_timer is not None:
+        _config_save_timer.cancel()
+    _config_save_timer = threading.Timer(CONFIG_SAVE_DELAY, flush_config)
+    _config_save_timer.daemon = True
+    _config_save_timer.start()
 
 def save_config(config: dict):
-    try:
-        with open(CONFIG_PATH, 'w') as f:
-            json.dump(config, f, indent=2)
-    except Exception as e:
-        print(f"Failed to save config: {e}")
+    global _config_cache
+    with _config_lock:
+        _config_cache = copy.deepcopy(config)
+        _schedule_config_flush()
+
+def update_config(**changes):
+    """Set top-level config keys without copying the rest of the config.
+
+    Values must be JSON-compatible; no write is scheduled if nothing changed.
+    """
+    with _config_lock:
+        _refresh_config_cache()
+        if all(k in _config_cache and _config_cache[k] == v for k, v in changes.items()):
+            return
+        _config_cache.update(copy.deepcopy(changes))
+        _schedule_config_flush()
+
+def flush_config():
+    """Write the cached config to disk now (cancels any pending debounced write)."""
+    global _config_mtime, _config_save_timer
+    with _config_lock:
+        if _config_save_timer is not None:
+            _config_save_timer.cancel()
+            _config_save_timer = None
+        if _config_cache is None:
+            return
+        try:
+            # Same layout as before the cache was added; users edit this file by hand
+            text = json.dumps(_config_cache, indent=2)
+            # Write-then-rename so a crash mid-write never leaves a truncated config
+            tmp_path = CONFIG_PATH + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, CONFIG_PATH)
+            _config_mtime = os.stat(CONFIG_PATH).st_mtime
+        except Exception as e:
+            print(f"Failed to save config: {e}")
 
 
 # ─── HTTP Notification Server ──────────────────────────────────────
@@ -89,6 +157,13 @@ class HookNotificationHandler(BaseHTTPRequestHandler):
     """HTTP handler for receiving hook notifications from droid."""
     
     coordinator = None  # Will be set by AppCoordinator
+    # Keep-alive: clients that reuse a connection skip the TCP setup per hook.
+    # Every response must therefore carry a Content-Length, and every request
+    # body must be consumed before replying.
+    protocol_version = 'HTTP/1.1'
+    # Idle keep-alive connections are dropped after this many seconds of silence
+    timeout = 5
+    _OK_RESPONSE = b'{"status":"ok"}'
     
     def log_message(self, format, *args):
         """Suppress default logging."""
@@ -96,41 +171,58 @@ class HookNotificationHandler(BaseHTTPRequestHandler):
     
     def do_POST(self):
         """Handle POST requests from droid hooks."""
-        if self.path == '/api/hook-notify':
-            try:
-                content_length = int(self.headers.get('Content-Length', 0))
-                body = self.rfile.read(content_length).decode('utf-8')
-                data = json.loads(body) if body else {}
-                
-                # Notify the web app to refresh
-                if HookNotificationHandler.coordinator:
-                    HookNotificationHandler.coordinator.notify_web_refresh(data)
-                
-                self.send_response(200)
-                self.send_header('Content-Type', 'application/json; charset=utf-8')
-                self.end_headers()
-                self.wfile.write('{"status":"ok"}'.encode('utf-8'))
-            except Exception as e:
-                print(f"Hook notification error: {e}")
-                self.send_response(500)
-                self.end_headers()
-        else:
-            self.send_response(404)
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+        except ValueError:
+            content_length = -1
+        if content_length < 0 or 'Transfer-Encoding' in self.headers:
+            # Can't tell where the body ends: reply, then drop the connection
+            self.close_connection = True
+            self._send_empty(400)
+            return
+        # Read the body even for unknown paths so the next request on the
+        # connection starts at a request line
+        body = self.rfile.read(content_length) if content_length else b''
+        if self.path != '/api/hook-notify':
+            self._send_empty(404)
+            return
+        try:
+            # json.loads detects UTF-8 itself, so the bytes go in without a decode pass
+            data = json.loads(body) if body else {}
+            
+            # Notify the web app to refresh
+            if HookNotificationHandler.coordinator:
+                HookNotificationHandler.coordinator.notify_web_refresh(data)
+            
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(self._OK_RESPONSE)))
             self.end_headers()
+            self.wfile.write(self._OK_RESPONSE)
+        except Exception as e:
+            print(f"Hook notification error: {e}")
+            self._send_empty(500)
+
+    def _send_empty(self, code):
+        self.send_response(code)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
 
 
 def start_http_server(coordinator, port=8888):
     """Start HTTP server in background thread."""
     HookNotificationHandler.coordinator = coordinator
     try:
-        server = HTTPServer(('127.0.0.1', port), HookNotificationHandler)
+        # One thread per request so concurrent hook POSTs don't queue behind each other
+        server = ThreadingHTTPServer(('127.0.0.1', port), HookNotificationHandler)
     except OSError as e:
         print(f"ERROR: Failed to start hook server on port {port}: {e}")
         print("  Hook notifications from droid/codex will not be received.")
         print(f"  Check if another process is using port {port}: lsof -i :{port}")
         return None
-    server.timeout = 1  # prevent blocking on shutdown
-    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    # The server is never shut down (the thread is a daemon), so the shutdown-flag
+    # poll only needs to run rarely; requests still wake the selector immediately.
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 5}, daemon=True)
     thread.start()
     print(f"Hook notification server listening on http://127.0.0.1:{port}")
     return server
@@ -138,6 +230,27 @@ def start_http_server(coordinator, port=8888):
 
 # ─── Vite Dev Server Management ────────────────────────────────────
 
+def is_port_open(port, timeout=0.1):
+    """Return True if something accepts TCP connections on the loopback port.
+
+    Checks both 127.0.0.1 and ::1, since Node may bind 'localhost' to either.
+    """
+    for family, host in ((socket.AF_INET, '127.0.0.1'), (socket.AF_INET6, '::1')):
+        try:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+        except OSError:
+            continue
+        sock.settimeout(timeout)
+        try:
+            if sock.connect_ex((host, port)) == 0:
+                return True
+        except OSError:
+            pass
+        finally:
+            sock.close()
+    return False
+
+
 def start_vite_server():
     """Start Vite dev server in the app directory."""
     app_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'app')
@@ -147,19 +260,25 @@ def start_vite_server():
         print(f"Warning: app directory not found at {app_dir}")
         return None
     
-    # Kill any existing process on port 5173 to avoid Vite picking another port
-    try:
-        result = subprocess.run(
-            ['lsof', '-ti', ':5173'],
-            capture_output=True, text=True, timeout=5
-        )
-        for pid in result.stdout.strip().split('\n'):
-            if pid.strip():
-                os.kill(int(pid.strip()), signal.SIGTERM)
-                print(f"Killed existing process on port 5173 (PID: {pid.strip()})")
-                time.sleep(0.5)
-    except Exception:
-        pass
+    # Kill any existing process on port 5173 to avoid Vite picking another port.
+    # A plain connect() answers "is anything listening?" in microseconds; only
+    # pay for the lsof process scan when the port is actually taken.
+    if is_port_open(5173):
+        try:
+            # Only the listener: `-ti :5173` also matched clients connected to it
+            result = subprocess.run(
+                ['lsof', '-ti', 'tcp:5173', '-sTCP:LISTEN'],
+                capture_output=True, text=True, timeout=5
+            )
+            for pid in result.stdout.split():
+                os.kill(int(pid), signal.SIGTERM)
+                print(f"Killed existing process on port 5173 (PID: {pid})")
+        except Exception:
+            pass
+        # Wait for the port to be released rather than a fixed delay per PID
+        deadline = time.time() + 2
+        while is_port_open(5173) and time.time() < deadline:
+            time.sleep(0.05)
     
     print(f"Starting Vite dev server in {app_dir}...")
     try:
@@ -169,7 +288,7 @@ def start_vite_server():
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
             stdin=subprocess.DEVNULL,
-            preexec_fn=os.setsid,
+            start_new_session=True,
         )
         print(f"Vite dev server started (PID: {process.pid})")
         return process
@@ -179,16 +298,21 @@ def start_vite_server():
 
 
 def wait_for_vite_ready(url='http://localhost:5173', timeout=30):
-    """Wait for Vite dev server to be ready."""
+    """Wait for Vite dev server to be ready.
+
+    Vite only starts listening once it can serve requests, so a bare TCP
+    connect is enough; probes back off from 50ms up to 100ms.
+    """
     print(f"Waiting for Vite dev server at {url}...")
     start_time = time.time()
+    delay = 0.05
+    port = urlparse(url).port or 80
     while time.time() - start_time < timeout:
-        try:
-            urllib.request.urlopen(url, timeout=1)
+        if is_port_open(port, timeout=0.2):
             print("Vite dev server is ready!")
             return True
-        except Exception:
-            time.sleep(0.5)
+        time.sleep(delay)
+        delay = min(delay * 1.5, 0.1)
     print("Timeout waiting for Vite dev server")
     return False
 
@@ -208,6 +332,24 @@ class TerminalSession:
         self.on_exit = None
         self._alive = False
         self._started = False
+        self._chunk_size = self._PTY_CHUNK_SIZE
+        # Self-pipe used by kill() to wake the blocking selector in _read_loop.
+        # Created in start(); _fd_lock keeps kill() from writing to a pipe fd
+        # the reader has already closed (and the OS may have reused).
+        self._shutdown_r = self._shutdown_w = None
+        self._sel = None
+        self._reader = None
+        self._fd_lock = threading.Lock()
+        # Input waiting for the writer thread, so callers (often the main
+        # thread) never block on a full PTY
+        self._write_queue = deque()
+        self._write_cond = threading.Condition()
+        self._writer = None
+        # Reused for every PTY read (os.readv fills it in place)
+        self._read_buf = bytearray(65536)
+        self._read_view = memoryview(self._read_buf)
+        # Shared by output consumers that need text (keeps split UTF-8 sequences intact)
+        self.output_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
 
     def start(self, cols=80, rows=24):
         """Start PTY with exact dimensions from xterm.js."""
@@ -240,48 +382,112 @@ class TerminalSession:
         else:
             self.pid = pid
             self.master_fd = fd
+            # Non-blocking so the writer thread can keep checking _alive while
+            # the PTY is full; _write_all() waits for writability instead.
+            flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+            fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+            # The limit that actually bounds a write is the tty input queue (MAX_INPUT),
+            # not kern.tty.ptmx_max (that sysctl caps the number of PTY devices). When
+            # the fd reports a larger queue, chunk to it with _PTY_CHUNK_SIZE's ~20% headroom.
+            try:
+                max_input = os.fpathconf(fd, 'PC_MAX_INPUT')
+            except (OSError, ValueError):
+                max_input = -1
+            self._chunk_size = max(self._PTY_CHUNK_SIZE, max_input * 4 // 5)
             self._alive = True
             self._set_size(self.cols, self.rows)
-            t = threading.Thread(target=self._read_loop, daemon=True)
-            t.start()
+            try:
+                self._shutdown_r, self._shutdown_w = os.pipe()
+                self._sel = selectors.DefaultSelector()
+                self._sel.register(self.master_fd, selectors.EVENT_READ)
+                self._sel.register(self._shutdown_r, selectors.EVENT_READ)
+                self._reader = threading.Thread(target=self._read_loop, daemon=True)
+                self._reader.start()
+                self._writer = threading.Thread(target=self._write_loop, name='pty-writer', daemon=True)
+                self._writer.start()
+            except Exception:
+                self._alive = False
+                self._wake_writer()
+                if self._reader is None or not self._reader.is_alive():
+                    self._close_shutdown_pipe()
+                raise
 
     # macOS PTY input buffer is very small (kern.tty.ptmx_max = 511 bytes).
     # Writing more than this in a single os.write() causes data loss.
-    # We chunk writes and use a small delay between chunks to let the PTY drain.
+    # We chunk writes and wait for writability between chunks to let the PTY drain.
     # CRITICAL: For bracketed paste mode (\x1b[200~ ... \x1b[201~), we must write
     # all chunks rapidly without delay, otherwise the terminal may interpret the
     # pause as end-of-paste and truncate the input.
     _PTY_CHUNK_SIZE = 400  # Increased: closer to 511-byte limit but still safe
-    _PTY_CHUNK_DELAY = 0.005  # Reduced to 5ms: fast enough to avoid paste timeout
+
+    _PTY_WRITE_POLL = 0.5  # How often a write waiting on a full PTY rechecks that the session is alive
 
     def write(self, data: bytes):
+        """Queue input for the PTY. Never blocks; the writer thread delivers it in order."""
         if self.master_fd is not None and self._alive:
+            with self._write_cond:
+                self._write_queue.append(bytes(data))
+                self._write_cond.notify()
+
+    def _wake_writer(self):
+        with self._write_cond:
+            self._write_cond.notify_all()
+
+    def _write_loop(self):
+        while True:
+            with self._write_cond:
+                while self._alive and not self._write_queue:
+                    self._write_cond.wait()
+                if not self._alive:
+                    self._write_queue.clear()
+                    return
+                # Everything queued so far goes out as one stream, in order
+                data = b''.join(self._write_queue)
+                self._write_queue.clear()
+            if len(data) <= self._chunk_size:
+                ok = self._write_all(data)
+            else:
+                # Large write: chunk it to avoid PTY buffer overflow
+                ok = self._write_chunked(data)
+            if not ok and self._alive:
+                print(f"[TerminalSession] PTY write failed for PID={self.pid}; {len(data)} bytes of input not delivered")
+
+    def _write_all(self, data) -> bool:
+        """Write all of data to the non-blocking master fd, resuming after short writes.
+
+        Waits as long as the PTY stays full. Returns False only if the write
+        failed or the session died first.
+        """
+        mv = memoryview(data)
+        while mv:
             try:
-                if len(data) <= self._PTY_CHUNK_SIZE:
-                    os.write(self.master_fd, data)
-                else:
-                    # Large write: chunk it to avoid PTY buffer overflow
-                    self._write_chunked(data)
-            except OSError:
-                pass
+                n = os.write(self.master_fd, mv)
+            except BlockingIOError:
+                if not self._alive:
+                    return False
+                select.select([], [self.master_fd], [], self._PTY_WRITE_POLL)
+                continue
+            except OSError as e:
+                print(f"[TerminalSession] PTY write error for PID={self.pid}: {e}")
+                return False
+            mv = mv[n:]
+        return True
 
-    def _write_chunked(self, data: bytes):
-        """Write data in small chunks with minimal delays to avoid PTY buffer overflow.
-        
-        Uses a tight loop with very short delays (5ms) to keep data flowing continuously,
-        which is critical for bracketed paste mode where pauses can cause truncation.
+    def _write_chunked(self, data: bytes) -> bool:
+        """Write data in small chunks to avoid PTY buffer overflow.
+
+        Each chunk goes out as soon as the PTY has room (_write_all waits on
+        select() when it is full), so data keeps flowing continuously, which is
+        critical for bracketed paste mode where pauses can cause truncation.
         """
+        mv = memoryview(data)
         offset = 0
-        while offset < len(data) and self._alive:
-            end = min(offset + self._PTY_CHUNK_SIZE, len(data))
-            chunk = data[offset:end]
-            try:
-                os.write(self.master_fd, chunk)
-            except OSError:
-                break
+        while offset < len(mv):
+            end = offset + self._chunk_size
+            if not self._write_all(mv[offset:end]):
+                return False
             offset = end
-            if offset < len(data):
-                time.sleep(self._PTY_CHUNK_DELAY)
+        return True
 
     def resize(self, cols: int, rows: int):
         if cols == self.cols and rows == self.rows:
@@ -292,28 +498,45 @@ class TerminalSession:
             self._set_size(cols, rows)
 
     def _kill_descendants(self, pid):
-        """Recursively kill all descendant processes of the given PID."""
-        import subprocess
+        """Kill all descendant processes of the given PID, deepest first."""
+        # One process-table snapshot instead of a `pgrep -P` fork per PID in the tree
         try:
             result = subprocess.run(
-                ['pgrep', '-P', str(pid)],
+                ['ps', '-A', '-o', 'pid=', '-o', 'ppid='],
                 capture_output=True, text=True, timeout=2
             )
-            for child_pid_str in result.stdout.strip().split('\n'):
-                if child_pid_str.strip():
-                    child_pid = int(child_pid_str.strip())
-                    self._kill_descendants(child_pid)  # depth-first: kill grandchildren first
-                    try:
-                        os.kill(child_pid, signal.SIGTERM)
-                        print(f"[TerminalSession] Killed descendant PID={child_pid} of PID={pid}")
-                    except (ProcessLookupError, OSError):
-                        pass
         except Exception:
-            pass
+            return
+        children = {}
+        for line in result.stdout.splitlines():
+            fields = line.split()
+            if len(fields) == 2 and fields[0].isdigit() and fields[1].isdigit():
+                children.setdefault(int(fields[1]), []).append(int(fields[0]))
+        # Breadth-first collection; reversed, every process is signalled before its parent
+        descendants = []
+        queue = deque(children.get(pid, ()))
+        while queue:
+            child_pid = queue.popleft()
+            descendants.append(child_pid)
+            queue.extend(children.get(child_pid, ()))
+        for child_pid in reversed(descendants):
+            try:
+                os.kill(child_pid, signal.SIGTERM)
+                print(f"[TerminalSession] Killed descendant PID={child_pid} of PID={pid}")
+            except (ProcessLookupError, OSError):
+                pass
 
     def kill(self):
         print(f"[TerminalSession] kill() called for PID={self.pid}, alive={self._alive}")
         self._alive = False
+        self._wake_writer()
+        # Wake the read loop immediately instead of waiting for output
+        with self._fd_lock:
+            if self._shutdown_w is not None:
+                try:
+                    os.write(self._shutdown_w, b'\x00')
+                except OSError:
+                    pass
         if self.pid:
             # Kill all descendant processes first (depth-first),
             # because child processes like node/codex may create their own process groups
@@ -326,6 +549,30 @@ class TerminalSession:
             except (ProcessLookupError, OSError):
                 pass
 
+    def close(self):
+        """Release the wake-up pipe and selector of a session whose reader isn't running.
+
+        A running read loop releases them itself when it exits, so this is a
+        no-op then; it is safe to call more than once.
+        """
+        if self._reader is None or not self._reader.is_alive():
+            self._close_shutdown_pipe()
+
+    def _close_shutdown_pipe(self):
+        with self._fd_lock:
+            sel, self._sel = self._sel, None
+            shutdown_fds = (self._shutdown_r, self._shutdown_w)
+            self._shutdown_r = self._shutdown_w = None
+        if sel is not None:
+            sel.close()
+        for fd in shutdown_fds:
+            if fd is None:
+                continue
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
     def _set_size(self, cols, rows):
         try:
             winsize = struct.pack('HHHH', rows, cols, 0, 0)
@@ -336,19 +583,59 @@ class TerminalSession:
         except (OSError, ProcessLookupError):
             pass
 
+    # Upper bound on how much already-queued output is merged into one on_output call
+    _READ_COALESCE_MAX = 256 * 1024
+
+    def _read_coalesced(self) -> bytes:
+        """Read one chunk, then drain whatever else is already queued on the PTY.
+
+        Bursty commands (e.g. `ls -R`) otherwise produce one on_output call —
+        and one webview round-trip — per 64KB read.
+        """
+        n = os.readv(self.master_fd, [self._read_buf])
+        first = bytes(self._read_view[:n])
+        if not n:
+            return first
+        # Common case is a single read: return it without an extra copy
+        chunks = None
+        total = n
+        while total < self._READ_COALESCE_MAX:
+            ready = self._sel.select(timeout=0)
+            if not any(key.fd == self.master_fd for key, _ in ready):
+                break
+            try:
+                n = os.readv(self.master_fd, [self._read_buf])
+            except OSError:
+                break
+            if not n:
+                break
+            if chunks is None:
+                chunks = [first]
+            chunks.append(bytes(self._read_view[:n]))
+            total += n
+        return b''.join(chunks) if chunks else first
+
     def _read_loop(self):
         try:
             while self._alive:
-                r, _, _ = select.select([self.master_fd], [], [], 0.01)
-                if r:
-                    try:
-                        data = os.read(self.master_fd, 65536)
-                        if data and self.on_output:
-                            self.on_output(data)
-                    except OSError:
-                        break
+                # Block until the PTY has output or kill() writes to the shutdown pipe
+                events = self._sel.select(timeout=None)
+                if any(key.fd == self._shutdown_r for key, _ in events):
+                    break
+                try:
+                    data = self._read_coalesced()
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    break
+                if not data:
+                    break
+                if self.on_output:
+                    self.on_output(data)
         finally:
             self._alive = False
+            self._wake_writer()
+            self._close_shutdown_pipe()
             if self.on_exit:
                 try:
                     _, status = os.waitpid(self.pid, os.WNOHANG)
@@ -367,6 +654,62 @@ class NativeBridgeHandler(NSObject):
         if self is None:
             return None
         self.coordinator = coordinator
+        self._git_log_cache = {}  # {repo_path: (head_sha, count, commits)}
+        # msg_type → handler, built once so each message is a single dict lookup
+        self._dispatch = {
+            # Terminal commands
+            'runCommand': self._handle_run_command,
+            'runCommandWithCallback': self._handle_run_command_with_callback,
+            'writeInput': self._handle_write_input,
+            'startAgent': self._handle_start_agent,
+            # File system operations
+            'fs_pickDirectory': self._handle_pick_directory,
+            'fs_readDirectory': self._handle_read_directory,
+            'fs_readFile': self._handle_read_file,
+            'fs_writeFile': self._handle_write_file,
+            # Git operations
+            'git_status': self._handle_git_status,
+            'git_add': self._handle_git_add,
+            'git_commit': self._handle_git_commit,
+            'git_log': self._handle_git_log,
+            'git_diff': self._handle_git_diff,
+            'git_branch': self._handle_git_branch,
+            # Review terminal commands
+            'startReviewTerminal': self._handle_start_review_terminal,
+            'writeReviewInput': self._handle_write_review_input,
+            'runReviewCommandWithCallback': self._handle_run_review_command_with_callback,
+            'stopReviewTerminal': self._handle_stop_review_terminal,
+            'reviewTerminalResize': self._handle_review_terminal_resize,
+            # Change terminal commands (multi-session)
+            'startChangeTerminal': self._handle_start_change_terminal,
+            'writeChangeInput': self._handle_write_change_input,
+            'runChangeCommandWithCallback': self._handle_run_change_command_with_callback,
+            'stopChangeTerminal': self._handle_stop_change_terminal,
+            'changeTerminalResize': self._handle_change_terminal_resize,
+            # Session tracking for persistence
+            'trackChangeSession': self._handle_track_change_session,
+            'untrackChangeSession': self._handle_untrack_change_session,
+            'trackCodexSession': self._handle_track_codex_session,
+            'untrackCodexSession': self._handle_untrack_codex_session,
+            'trackBatch': self._handle_track_batch,
+            # Confirmation dialog / Auto Fix
+            'showConfirmationDialog': self._handle_show_confirmation_dialog,
+            'openAutoFixWindow': self._handle_open_autofix_window,
+            'autoFixSendFailed': self._handle_autofix_send_failed,
+            # Ops Agent
+            'createOpsAgentTab': self._handle_create_ops_agent_tab,
+            'opsAgentRefreshLogList': self._handle_ops_agent_refresh_log_list,
+            'opsAgentSelectLogFile': self._handle_ops_agent_select_log_file,
+            'opsAgentAnalyzeLogs': self._handle_ops_agent_analyze_logs,
+            'opsAgentSaveState': self._handle_ops_agent_save_state_msg,
+            'opsAgentLoadState': self._handle_ops_agent_load_state_msg,
+            'opsAgentExportLog': self._handle_ops_agent_export_log,
+            'opsAgentAddLogFile': self._handle_ops_agent_add_log_file,
+            'opsAgentDeleteLogFile': self._handle_ops_agent_delete_log_file,
+            'opsAgentWorkerOutput': self._handle_ops_agent_worker_output,
+            # JS console forwarding
+            'jsConsole': self._handle_js_console,
+        }
         return self
 
     def userContentController_didReceiveScriptMessage_(self, controller, message):
@@ -377,7 +720,7 @@ class NativeBridgeHandler(NSObject):
             if handler_name == 'terminalInput':
                 data = message.body()
                 if isinstance(data, str) and self.coordinator:
-                    self.coordinator.write_to_terminal(data)
+                    self.coordinator.terminal.write(data.encode('utf-8'))
                 return
 
             # Terminal resize handler
@@ -399,223 +742,233 @@ class NativeBridgeHandler(NSObject):
                 return
 
             msg_type = msg.get('type')
+            handler = self._dispatch.get(msg_type)
+            if handler:
+                handler(msg)
 
-            # Terminal commands
-            if msg_type == 'runCommand':
-                command = msg.get('command', '')
-                self.coordinator.log('send', 'runCommand', command)
-                self.coordinator.write_to_terminal(command + '\n')
-            elif msg_type == 'runCommandWithCallback':
-                command = msg.get('command', '')
-                callback_id = msg.get('callbackId', '')
-                prompt_pattern = msg.get('promptPattern', 'shell')  # 'shell' or 'droid'
-                self.coordinator.run_command_with_callback(command, callback_id, prompt_pattern)
-            elif msg_type == 'writeInput':
-                data = msg.get('data', '')
-                self.coordinator.write_to_terminal(data)
-            elif msg_type == 'startAgent':
-                agent_cmd = msg.get('command', '')
-                self.coordinator.log('send', 'startAgent', agent_cmd)
-                self.coordinator.write_to_terminal(agent_cmd + '\n')
-            
-            # File system operations
-            elif msg_type == 'fs_pickDirectory':
-                self._handle_pick_directory(msg)
-            elif msg_type == 'fs_readDirectory':
-                self._handle_read_directory(msg)
-            elif msg_type == 'fs_readFile':
-                self._handle_read_file(msg)
-            elif msg_type == 'fs_writeFile':
-                self._handle_write_file(msg)
-            
-            # Git operations
-            elif msg_type == 'git_status':
-                self._handle_git_status(msg)
-            elif msg_type == 'git_add':
-                self._handle_git_add(msg)
-            elif msg_type == 'git_commit':
-                self._handle_git_commit(msg)
-            elif msg_type == 'git_log':
-                self._handle_git_log(msg)
-            elif msg_type == 'git_diff':
-                self._handle_git_diff(msg)
-            elif msg_type == 'git_branch':
-                self._handle_git_branch(msg)
-            
-            # Review terminal commands
-            elif msg_type == 'startReviewTerminal':
-                project_path = msg.get('projectPath', '')
-                self.coordinator.log('send', 'startReviewTerminal', project_path)
-                if self.coordinator._review_terminal_ready:
-                    # Review terminal already running — immediately fire the shell-ready callback
-                    self.coordinator.log('info', 'startReviewTerminal', 'Already running, firing shell-ready immediately')
-                    js = "if (window.__onReviewCommandCallback) window.__onReviewCommandCallback('review-shell-ready');"
-                    def do_eval():
-                        self.coordinator.webview.evaluateJavaScript_completionHandler_(js, None)
-                    NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
-                else:
-                    self.coordinator.start_review_terminal(80, 24)
-                    # Register a callback to detect when the shell prompt is ready
-                    self.coordinator._review_pending_callbacks['review-shell-ready'] = {
-                        'pattern': 'shell',
-                        'buffer': '',
-                        'command': '(shell startup)',
-                    }
-            elif msg_type == 'writeReviewInput':
-                data = msg.get('data', '')
-                self.coordinator.write_to_review_terminal(data)
-            elif msg_type == 'runReviewCommandWithCallback':
-                command = msg.get('command', '')
-                callback_id = msg.get('callbackId', '')
-                prompt_pattern = msg.get('promptPattern', 'shell')
-                self.coordinator.run_review_command_with_callback(command, callback_id, prompt_pattern)
-            elif msg_type == 'stopReviewTerminal':
-                self.coordinator.log('send', 'stopReviewTerminal', '')
-                self.coordinator.stop_review_terminal()
-            elif msg_type == 'reviewTerminalResize':
-                cols = int(msg.get('cols', 80))
-                rows = int(msg.get('rows', 24))
-                self.coordinator.resize_review_terminal(cols, rows)
+        except Exception as e:
+            print(f"NativeBridgeHandler error: {e}")
 
-            # Change terminal commands (multi-session)
-            elif msg_type == 'startChangeTerminal':
-                tab_id = msg.get('tabId', '')
-                cols = int(msg.get('cols', 80))
-                rows = int(msg.get('rows', 24))
-                self.coordinator.log('send', 'startChangeTerminal', f'tab={tab_id}')
-                self.coordinator.start_change_terminal(tab_id, cols, rows)
-                # Register a callback to detect when the shell prompt is ready
-                if tab_id not in self.coordinator._change_pending_callbacks:
-                    self.coordinator._change_pending_callbacks[tab_id] = {}
-                self.coordinator._change_pending_callbacks[tab_id][f'{tab_id}-shell-ready'] = {
-                    'pattern': 'shell',
-                    'buffer': '',
-                    'command': '(shell startup)',
-                    'created_at': time.time(),
-                }
-            elif msg_type == 'writeChangeInput':
-                tab_id = msg.get('tabId', '')
-                data = msg.get('data', '')
-                self.coordinator.write_to_change_terminal(tab_id, data)
-            elif msg_type == 'runChangeCommandWithCallback':
-                tab_id = msg.get('tabId', '')
-                command = msg.get('command', '')
-                callback_id = msg.get('callbackId', '')
-                prompt_pattern = msg.get('promptPattern', 'shell')
-                self.coordinator.run_change_command_with_callback(tab_id, command, callback_id, prompt_pattern)
-            elif msg_type == 'stopChangeTerminal':
-                tab_id = msg.get('tabId', '')
-                self.coordinator.log('send', 'stopChangeTerminal', f'tab={tab_id}')
-                self.coordinator.stop_change_terminal(tab_id)
-            elif msg_type == 'changeTerminalResize':
-                tab_id = msg.get('tabId', '')
-                cols = int(msg.get('cols', 80))
-                rows = int(msg.get('rows', 24))
-                self.coordinator.resize_change_terminal(tab_id, cols, rows)
+    # ─── Terminal Commands ───
+
+    def _handle_run_command(self, msg):
+        command = msg.get('command', '')
+        self.coordinator.log('send', 'runCommand', command)
+        self.coordinator.write_to_terminal(command + '\n')
+
+    def _handle_run_command_with_callback(self, msg):
+        command = msg.get('command', '')
+        callback_id = msg.get('callbackId', '')
+        prompt_pattern = msg.get('promptPattern', 'shell')  # 'shell' or 'droid'
+        self.coordinator.run_command_with_callback(command, callback_id, prompt_pattern)
+
+    def _handle_write_input(self, msg):
+        data = msg.get('data', '')
+        self.coordinator.write_to_terminal(data)
+
+    def _handle_start_agent(self, msg):
+        agent_cmd = msg.get('command', '')
+        self.coordinator.log('send', 'startAgent', agent_cmd)
+        self.coordinator.write_to_terminal(agent_cmd + '\n')
+
+    # ─── Review Terminal Commands ───
+
+    def _handle_start_review_terminal(self, msg):
+        project_path = msg.get('projectPath', '')
+        self.coordinator.log('send', 'startReviewTerminal', project_path)
+        if self.coordinator._review_terminal_ready:
+            # Review terminal already running — immediately fire the shell-ready callback
+            self.coordinator.log('info', 'startReviewTerminal', 'Already running, firing shell-ready immediately')
+            js = "if (window.__onReviewCommandCallback) window.__onReviewCommandCallback('review-shell-ready');"
+            self.coordinator.eval_js_batched(js)
+        else:
+            self.coordinator.start_review_terminal(80, 24)
+            # Register a callback to detect when the shell prompt is ready
+            self.coordinator._review_pending_callbacks['review-shell-ready'] = \
+                self.coordinator.new_callback_info('shell', '(shell startup)')
+
+    def _handle_write_review_input(self, msg):
+        data = msg.get('data', '')
+        self.coordinator.write_to_review_terminal(data)
+
+    def _handle_run_review_command_with_callback(self, msg):
+        command = msg.get('command', '')
+        callback_id = msg.get('callbackId', '')
+        prompt_pattern = msg.get('promptPattern', 'shell')
+        self.coordinator.run_review_command_with_callback(command, callback_id, prompt_pattern)
+
+    def _handle_stop_review_terminal(self, msg):
+        self.coordinator.log('send', 'stopReviewTerminal', '')
+        self.coordinator.stop_review_terminal()
+
+    def _handle_review_terminal_resize(self, msg):
+        cols = int(msg.get('cols', 80))
+        rows = int(msg.get('rows', 24))
+        self.coordinator.resize_review_terminal(cols, rows)
+
+    # ─── Change Terminal Commands (multi-session) ───
+
+    def _handle_start_change_terminal(self, msg):
+        tab_id = msg.get('tabId', '')
+        cols = int(msg.get('cols', 80))
+        rows = int(msg.get('rows', 24))
+        self.coordinator.log('send', 'startChangeTerminal', f'tab={tab_id}')
+        self.coordinator.start_change_terminal(tab_id, cols, rows)
+        # Register a callback to detect when the shell prompt is ready
+        if tab_id not in self.coordinator._change_pending_callbacks:
+            self.coordinator._change_pending_callbacks[tab_id] = {}
+        self.coordinator._change_pending_callbacks[tab_id][f'{tab_id}-shell-ready'] = \
+            self.coordinator.new_callback_info('shell', '(shell startup)')
+
+    def _handle_write_change_input(self, msg):
+        tab_id = msg.get('tabId', '')
+        data = msg.get('data', '')
+        self.coordinator.write_to_change_terminal(tab_id, data)
+
+    def _handle_run_change_command_with_callback(self, msg):
+        tab_id = msg.get('tabId', '')
+        command = msg.get('command', '')
+        callback_id = msg.get('callbackId', '')
+        prompt_pattern = msg.get('promptPattern', 'shell')
+        self.coordinator.run_change_command_with_callback(tab_id, command, callback_id, prompt_pattern)
+
+    def _handle_stop_change_terminal(self, msg):
+        tab_id = msg.get('tabId', '')
+        self.coordinator.log('send', 'stopChangeTerminal', f'tab={tab_id}')
+        self.coordinator.stop_change_terminal(tab_id)
+
+    def _handle_change_terminal_resize(self, msg):
+        tab_id = msg.get('tabId', '')
+        cols = int(msg.get('cols', 80))
+        rows = int(msg.get('rows', 24))
+        self.coordinator.resize_change_terminal(tab_id, cols, rows)
+
+    # ─── Session Tracking (persistence) ───
+
+    def _handle_track_change_session(self, msg):
+        tab_id = msg.get('tabId', '')
+        session_id = msg.get('sessionId', '')
+        change_id = msg.get('changeId', None)
+        if tab_id and session_id:
+            self.coordinator.active_change_sessions[tab_id] = {
+                'sessionId': session_id,
+                'changeId': change_id,
+            }
+            self.coordinator.log('info', 'trackChangeSession', f'tab={tab_id}, session={session_id}, change={change_id}')
+            self.coordinator.schedule_session_save()
+
+    def _handle_untrack_change_session(self, msg):
+        tab_id = msg.get('tabId', '')
+        self.coordinator.active_change_sessions.pop(tab_id, None)
+        self.coordinator.log('info', 'untrackChangeSession', f'tab={tab_id}')
+        self.coordinator.schedule_session_save()
+
+    def _handle_track_codex_session(self, msg):
+        tab_id = msg.get('tabId', '')
+        session_id = msg.get('sessionId', '')
+        change_id = msg.get('changeId', None)
+        if tab_id and session_id:
+            self.coordinator.active_codex_sessions[tab_id] = {
+                'sessionId': session_id,
+                'changeId': change_id,
+            }
+            self.coordinator.log('info', 'trackCodexSession', f'tab={tab_id}, session={session_id}, change={change_id}')
+            self.coordinator.schedule_session_save()
 
-            # Session tracking for persistence
-            elif msg_type == 'trackChangeSession':
-                tab_id = msg.get('tabId', '')
-                session_id = msg.get('sessionId', '')
-                change_id = msg.get('changeId', None)
-                if tab_id and session_id:
-                    self.coordinator.active_change_sessions[tab_id] = {
-                        'sessionId': session_id,
-                        'changeId': change_id,
-                    }
-                    self.coordinator.log('info', 'trackChangeSession', f'tab={tab_id}, session={session_id}, change={change_id}')
-            elif msg_type == 'untrackChangeSession':
-                tab_id = msg.get('tabId', '')
-                self.coordinator.active_change_sessions.pop(tab_id, None)
-                self.coordinator.log('info', 'untrackChangeSession', f'tab={tab_id}')
-            elif msg_type == 'trackCodexSession':
-                tab_id = msg.get('tabId', '')
-                session_id = msg.get('sessionId', '')
-                change_id = msg.get('changeId', None)
-                if tab_id and session_id:
-                    self.coordinator.active_codex_sessions[tab_id] = {
-                        'sessionId': session_id,
-                        'changeId': change_id,
-                    }
-                    self.coordinator.log('info', 'trackCodexSession', f'tab={tab_id}, session={session_id}, change={change_id}')
-            elif msg_type == 'untrackCodexSession':
-                tab_id = msg.get('tabId', '')
-                self.coordinator.active_codex_sessions.pop(tab_id, None)
-                self.coordinator.log('info', 'untrackCodexSession', f'tab={tab_id}')
-
-            # Confirmation dialog
-            elif msg_type == 'showConfirmationDialog':
-                request_id = msg.get('requestId')
-                dialog_data = msg.get('data', {})
-                self.coordinator.show_confirmation_dialog(str(request_id), dialog_data)
-
-            # Auto Fix window
-            elif msg_type == 'openAutoFixWindow':
-                change_id = msg.get('changeId', '')
-                project_path = msg.get('projectPath', '')
-                self.coordinator.open_autofix_window(change_id, project_path)
-
-            # Auto Fix send failure notification
-            elif msg_type == 'autoFixSendFailed':
-                worker_type = msg.get('workerType', '')
-                tab_id = msg.get('tabId', '')
-                self.coordinator.log('warn', 'autofix_send_failed', f'worker={worker_type}, tab={tab_id}')
-                # Notify all active Auto Fix windows
-                for afw in list(self.coordinator._autofix_windows):
-                    try:
-                        afw.on_send_failed(worker_type, tab_id)
-                    except Exception as e:
-                        print(f"[AutoFix] Send failure dispatch error: {e}")
-
-            # Ops Agent messages
-            elif msg_type == 'createOpsAgentTab':
-                project_path = msg.get('projectPath', '')
-                self.coordinator.log('info', 'ops_agent_create', f'Creating Ops Agent tab for: {project_path}')
-                self.coordinator.send_ops_agent_html(project_path)
-            elif msg_type == 'opsAgentRefreshLogList':
-                self.coordinator.log('info', 'ops_agent_refresh', 'Refreshing log list')
-                data = msg.get('data', {})
-                threading.Thread(target=self._handle_ops_agent_refresh, args=(data,), daemon=True).start()
-            elif msg_type == 'opsAgentSelectLogFile':
-                data = msg.get('data', {})
-                log_path = data.get('logPath', '')
-                self.coordinator.log('info', 'ops_agent_select', f'path={log_path}')
-                threading.Thread(target=self._handle_ops_agent_select_log, args=(data,), daemon=True).start()
-            elif msg_type == 'opsAgentAnalyzeLogs':
-                data = msg.get('data', {})
-                self.coordinator.log('info', 'ops_agent_analyze', f'logs={len(data.get("logPaths", []))}')
-                threading.Thread(target=self._handle_ops_agent_analyze, args=(data,), daemon=True).start()
-            elif msg_type == 'opsAgentSaveState':
-                data = msg.get('data', {})
-                self.coordinator.log('info', 'ops_agent_save_state', 'Saving state')
-                self._handle_ops_agent_save_state(data)
-            elif msg_type == 'opsAgentLoadState':
-                self.coordinator.log('info', 'ops_agent_load_state', 'Loading state')
-                data = msg.get('data', {})
-                self._handle_ops_agent_load_state(data)
-            elif msg_type == 'opsAgentExportLog':
-                log_path = msg.get('data', {}).get('logPath', '')
-                self.coordinator.log('info', 'ops_agent_export', f'Exporting: {log_path}')
-                self._handle_ops_agent_export(log_path)
-            elif msg_type == 'opsAgentAddLogFile':
-                self.coordinator.log('info', 'ops_agent_add_file', 'Adding log file')
-                self._handle_ops_agent_add_file()
-            elif msg_type == 'opsAgentDeleteLogFile':
-                log_path = msg.get('data', {}).get('logPath', '')
-                self.coordinator.log('info', 'ops_agent_delete_file', f'Deleting: {log_path}')
-                self._handle_ops_agent_delete_file(log_path)
-            elif msg_type == 'opsAgentWorkerOutput':
-                self.coordinator.log('info', 'ops_agent_worker_output', 'Worker output received')
-                # TODO: Implement worker output handling
+    def _handle_untrack_codex_session(self, msg):
+        tab_id = msg.get('tabId', '')
+        self.coordinator.active_codex_sessions.pop(tab_id, None)
+        self.coordinator.log('info', 'untrackCodexSession', f'tab={tab_id}')
+        self.coordinator.schedule_session_save()
 
-            # JS console forwarding
-            elif msg_type == 'jsConsole':
-                level = msg.get('level', 'log')
-                message = msg.get('message', '')
-                self.coordinator.log('js', level, message)
+    _TRACK_TYPES = ('trackChangeSession', 'untrackChangeSession', 'trackCodexSession', 'untrackCodexSession')
 
-        except Exception as e:
-            print(f"NativeBridgeHandler error: {e}")
+    def _handle_track_batch(self, msg):
+        """Apply session tracking ops queued by the bridge in one JS task, in order."""
+        for op in msg.get('ops', []):
+            if isinstance(op, dict) and op.get('type') in self._TRACK_TYPES:
+                self._dispatch[op['type']](op)
+
+    # ─── Confirmation Dialog / Auto Fix ───
+
+    def _handle_show_confirmation_dialog(self, msg):
+        request_id = msg.get('requestId')
+        dialog_data = msg.get('data', {})
+        self.coordinator.show_confirmation_dialog(str(request_id), dialog_data)
+
+    def _handle_open_autofix_window(self, msg):
+        change_id = msg.get('changeId', '')
+        project_path = msg.get('projectPath', '')
+        self.coordinator.open_autofix_window(change_id, project_path)
+
+    def _handle_autofix_send_failed(self, msg):
+        worker_type = msg.get('workerType', '')
+        tab_id = msg.get('tabId', '')
+        self.coordinator.log('warn', 'autofix_send_failed', f'worker={worker_type}, tab={tab_id}')
+        # Notify all active Auto Fix windows
+        for afw in list(self.coordinator._autofix_windows):
+            try:
+                afw.on_send_failed(worker_type, tab_id)
+            except Exception as e:
+                print(f"[AutoFix] Send failure dispatch error: {e}")
+
+    # ─── Ops Agent ───
+
+    def _handle_create_ops_agent_tab(self, msg):
+        project_path = msg.get('projectPath', '')
+        self.coordinator.log('info', 'ops_agent_create', f'Creating Ops Agent tab for: {project_path}')
+        self.coordinator.send_ops_agent_html(project_path)
+
+    def _handle_ops_agent_refresh_log_list(self, msg):
+        self.coordinator.log('info', 'ops_agent_refresh', 'Refreshing log list')
+        data = msg.get('data', {})
+        threading.Thread(target=self._handle_ops_agent_refresh, args=(data,), daemon=True).start()
+
+    def _handle_ops_agent_select_log_file(self, msg):
+        data = msg.get('data', {})
+        log_path = data.get('logPath', '')
+        self.coordinator.log('info', 'ops_agent_select', f'path={log_path}')
+        threading.Thread(target=self._handle_ops_agent_select_log, args=(data,), daemon=True).start()
+
+    def _handle_ops_agent_analyze_logs(self, msg):
+        data = msg.get('data', {})
+        self.coordinator.log('info', 'ops_agent_analyze', f'logs={len(data.get("logPaths", []))}')
+        threading.Thread(target=self._handle_ops_agent_analyze, args=(data,), daemon=True).start()
+
+    def _handle_ops_agent_save_state_msg(self, msg):
+        data = msg.get('data', {})
+        self.coordinator.log('info', 'ops_agent_save_state', 'Saving state')
+        self._handle_ops_agent_save_state(data)
+
+    def _handle_ops_agent_load_state_msg(self, msg):
+        self.coordinator.log('info', 'ops_agent_load_state', 'Loading state')
+        data = msg.get('data', {})
+        self._handle_ops_agent_load_state(data)
+
+    def _handle_ops_agent_export_log(self, msg):
+        log_path = msg.get('data', {}).get('logPath', '')
+        self.coordinator.log('info', 'ops_agent_export', f'Exporting: {log_path}')
+        self._handle_ops_agent_export(log_path)
+
+    def _handle_ops_agent_add_log_file(self, msg):
+        self.coordinator.log('info', 'ops_agent_add_file', 'Adding log file')
+        self._handle_ops_agent_add_file()
+
+    def _handle_ops_agent_delete_log_file(self, msg):
+        log_path = msg.get('data', {}).get('logPath', '')
+        self.coordinator.log('info', 'ops_agent_delete_file', f'Deleting: {log_path}')
+        self._handle_ops_agent_delete_file(log_path)
+
+    def _handle_ops_agent_worker_output(self, msg):
+        self.coordinator.log('info', 'ops_agent_worker_output', 'Worker output received')
+        # TODO: Implement worker output handling
+
+    # ─── JS Console Forwarding ───
+
+    def _handle_js_console(self, msg):
+        level = msg.get('level', 'log')
+        message = msg.get('message', '')
+        self.coordinator.log('js', level, message)
 
     def _handle_pick_directory(self, msg):
         """Show native directory picker and return path."""
@@ -633,9 +986,7 @@ class NativeBridgeHandler(NSObject):
                 url = panel.URLs()[0]
                 path = url.path()
                 # Save last opened directory
-                config = load_config()
-                config['lastDirectory'] = path
-                save_config(config)
+                update_config(lastDirectory=path)
                 self._send_response(request_id, {'success': True, 'path': path})
             else:
                 self._send_response(request_id, {'success': False, 'error': 'User cancelled'})
@@ -646,38 +997,45 @@ class NativeBridgeHandler(NSObject):
         """Read directory contents recursively."""
         request_id = msg.get('requestId')
         path = msg.get('path', '')
-        
-        try:
-            result = self._read_dir_recursive(path)
-            self._send_response(request_id, {'success': True, 'data': result})
-        except Exception as e:
-            self._send_response(request_id, {'success': False, 'error': str(e)})
+
+        def do_read():
+            try:
+                result = self._read_dir_recursive(path)
+                self._send_response(request_id, {'success': True, 'data': result})
+            except Exception as e:
+                self._send_response(request_id, {'success': False, 'error': str(e)})
+
+        self.coordinator.fs_pool.submit(do_read)
 
     def _read_dir_recursive(self, path: str) -> dict:
         """Recursively read directory structure."""
-        if not os.path.isdir(path):
-            raise ValueError(f"Not a directory: {path}")
-        
         entries = []
         try:
-            for name in os.listdir(path):
-                if name.startswith('.'):
-                    continue
-                full_path = os.path.join(path, name)
-                if os.path.isdir(full_path):
-                    entries.append({
-                        'name': name,
-                        'kind': 'directory',
-                        'path': full_path
-                    })
-                elif os.path.isfile(full_path):
+            # scandir exposes d_type from readdir, so is_dir()/is_file() only
+            # need a stat() for symlinks instead of two stats per entry.
+            # It also rejects non-directories itself, so no separate isdir() stat.
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.name.startswith('.'):
+                        continue
+                    try:
+                        if entry.is_dir():
+                            kind = 'directory'
+                        elif entry.is_file():
+                            kind = 'file'
+                        else:
+                            continue
+                    except OSError:
+                        continue
                     entries.append({
-                        'name': name,
-                        'kind': 'file',
-                        'path': full_path
+                        'name': entry.name,
+                        'kind': kind,
+                        'path': entry.path
                     })
         except PermissionError:
             pass
+        except (FileNotFoundError, NotADirectoryError):
+            raise ValueError(f"Not a directory: {path}")
         
         return {
             'name': os.path.basename(path),
@@ -686,17 +1044,65 @@ class NativeBridgeHandler(NSObject):
             'entries': sorted(entries, key=lambda x: (x['kind'] != 'directory', x['name']))
         }
 
+    # Files larger than this are streamed to the webview in chunks
+    _READ_FILE_STREAM_THRESHOLD = 256 * 1024
+    _READ_FILE_CHUNK_CHARS = 64 * 1024
+    _READ_FILE_CHUNK_TIMEOUT = 10.0  # Max wait for the webview to evaluate one chunk
+
     def _handle_read_file(self, msg):
         """Read file contents."""
         request_id = msg.get('requestId')
         path = msg.get('path', '')
-        
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            self._send_response(request_id, {'success': True, 'content': content})
-        except Exception as e:
-            self._send_response(request_id, {'success': False, 'error': str(e)})
+
+        def do_read():
+            try:
+                if os.path.getsize(path) > self._READ_FILE_STREAM_THRESHOLD:
+                    self._stream_file(request_id, path)
+                    return
+                with open(path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                self._send_response(request_id, {'success': True, 'content': content})
+            except Exception as e:
+                self._send_response(request_id, {'success': False, 'error': str(e)})
+
+        self.coordinator.fs_pool.submit(do_read)
+
+    def _stream_file(self, request_id, path: str):
+        """Send a large file as a series of chunks the bridge JS reassembles.
+
+        Runs on fs_pool. Each chunk is its own evaluateJavaScript call, and the
+        next chunk is only read once the webview has evaluated the previous one,
+        so at most one chunk (and its escaped JS copy) is in flight.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            chunk = f.read(self._READ_FILE_CHUNK_CHARS)
+            if not chunk:
+                # File was truncated after the size check
+                self._send_response(request_id, {'success': True, 'content': ''})
+                return
+            while chunk:
+                next_chunk = f.read(self._READ_FILE_CHUNK_CHARS)
+                if not self._send_chunk(request_id, chunk, not next_chunk):
+                    # Drops the partial chunks on the JS side
+                    self._send_response(request_id, {'success': False, 'error': 'File transfer timed out'})
+                    return
+                chunk = next_chunk
+
+    def _send_chunk(self, request_id, text: str, done: bool) -> bool:
+        """Evaluate one chunk of a streamed response and wait until the webview has run it.
+
+        Returns False if there is no webview or it didn't finish in _READ_FILE_CHUNK_TIMEOUT.
+        """
+        webview = self.coordinator.webview if self.coordinator else None
+        if not webview:
+            return False
+        js = (f"window.__nativeBridgeChunk && window.__nativeBridgeChunk("
+              f"{json.dumps(request_id)}, {json.dumps(text, ensure_ascii=False)}, {'true' if done else 'false'});")
+        evaluated = threading.Event()
+        def do_eval():
+            webview.evaluateJavaScript_completionHandler_(js, lambda result, error: evaluated.set())
+        NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+        return evaluated.wait(self._READ_FILE_CHUNK_TIMEOUT)
 
     def _handle_write_file(self, msg):
         """Write file contents. Auto-creates parent directories if needed."""
@@ -716,27 +1122,99 @@ class NativeBridgeHandler(NSObject):
 
     # ─── Git Operations ───
 
-    def _run_git(self, args: list, cwd: str) -> dict:
-        """Run a git command and return stdout/stderr/returncode."""
+    def _run_git(self, args: list, cwd: str, text: bool = True) -> dict:
+        """Run a git command and return stdout/stderr/returncode.
+
+        With text=False, stdout is returned as raw bytes (stderr is always str).
+        """
+        empty = '' if text else b''
         try:
             result = subprocess.run(
                 ['git'] + args,
                 cwd=cwd,
                 capture_output=True,
-                text=True,
+                text=text,
                 timeout=30,
             )
+            stderr = result.stderr
+            if not text:
+                stderr = stderr.decode('utf-8', errors='replace')
             return {
                 'stdout': result.stdout,
-                'stderr': result.stderr,
+                'stderr': stderr,
                 'returncode': result.returncode,
             }
         except subprocess.TimeoutExpired:
-            return {'stdout': '', 'stderr': 'Git command timed out', 'returncode': -1}
+            return {'stdout': empty, 'stderr': 'Git command timed out', 'returncode': -1}
         except FileNotFoundError:
-            return {'stdout': '', 'stderr': 'git not found on system', 'returncode': -1}
+            return {'stdout': empty, 'stderr': 'git not found on system', 'returncode': -1}
         except Exception as e:
-            return {'stdout': '', 'stderr': str(e), 'returncode': -1}
+            return {'stdout': empty, 'stderr': str(e), 'returncode': -1}
+
+    @staticmethod
+    def _parse_status_z(stdout: bytes):
+        """Parse `git status --porcelain=v1 --branch -z` output into (branch, files)."""
+        files = []
+        branch = ''
+        entries = iter(stdout.split(b'\x00'))
+        for entry in entries:
+            if entry.startswith(b'## '):
+                header = entry[3:].decode('utf-8', errors='replace')
+                branch = NativeBridgeHandler._parse_status_branch(header)
+                continue
+            if len(entry) < 4:
+                continue
+            index_status = chr(entry[0])
+            work_status = chr(entry[1])
+            files.append({
+                'index': index_status,
+                'working': work_status,
+                'path': entry[3:].decode('utf-8', errors='replace'),
+            })
+            # Renames/copies are followed by a separate entry holding the source path
+            if index_status in 'RC':
+                next(entries, None)
+        return branch, files
+
+    @staticmethod
+    def _parse_status_branch(header: str) -> str:
+        """Extract the branch name from a porcelain '## ' header (matches `branch --show-current`)."""
+        for prefix in ('No commits yet on ', 'Initial commit on '):
+            if header.startswith(prefix):
+                return header[len(prefix):]
+        if header.startswith('HEAD (no branch)'):
+            return ''
+        return header.split('...', 1)[0].split(' ', 1)[0]
+
+    @staticmethod
+    def _read_head_sha(path: str) -> str:
+        """Resolve HEAD by reading the repo's ref files, without spawning git.
+
+        Returns '' whenever the answer needs git itself (linked worktrees,
+        reftable refs, an unborn branch, a path below the repo root).
+        """
+        git_dir = os.path.join(path, '.git')
+        try:
+            with open(os.path.join(git_dir, 'HEAD'), 'rb') as f:
+                head = f.read().strip()
+            if not head.startswith(b'ref: '):
+                return head.decode('ascii') if len(head) in (40, 64) else ''  # detached
+            ref = head[5:]
+            try:
+                # A loose ref takes precedence over its packed-refs entry
+                with open(os.path.join(git_dir, os.fsdecode(ref)), 'rb') as f:
+                    sha = f.read().strip()
+            except FileNotFoundError:
+                sha = b''
+                with open(os.path.join(git_dir, 'packed-refs'), 'rb') as f:
+                    for line in f:
+                        fields = line.split()
+                        if len(fields) == 2 and fields[1] == ref:
+                            sha = fields[0]
+                            break
+            return sha.decode('ascii') if len(sha) in (40, 64) else ''
+        except (OSError, UnicodeDecodeError):
+            return ''
 
     def _handle_git_status(self, msg):
         """Get git status for a repo path."""
@@ -744,28 +1222,17 @@ class NativeBridgeHandler(NSObject):
         path = msg.get('path', '')
 
         def do_status():
-            r = self._run_git(['status', '--porcelain=v1'], path)
+            # -z: NUL-terminated entries with unquoted paths (safe for newlines/quotes)
+            # --branch: the first entry is a '## ' header, so one spawn covers both
+            # --no-optional-locks: a read-only query shouldn't take index.lock to refresh
+            # the index, which would contend with git commands run in the terminal
+            r = self._run_git(['--no-optional-locks', 'status', '--porcelain=v1', '--branch', '-z'],
+                              path, text=False)
             if r['returncode'] != 0:
                 self._send_response(request_id, {'success': False, 'error': r['stderr'].strip()})
                 return
 
-            files = []
-            for line in r['stdout'].splitlines():
-                if len(line) < 4:
-                    continue
-                index_status = line[0]
-                work_status = line[1]
-                filepath = line[3:]
-                files.append({
-                    'index': index_status,
-                    'working': work_status,
-                    'path': filepath,
-                })
-
-            # Also get current branch
-            br = self._run_git(['branch', '--show-current'], path)
-            branch = br['stdout'].strip() if br['returncode'] == 0 else ''
-
+            branch, files = self._parse_status_z(r['stdout'])
             self._send_response(request_id, {
                 'success': True,
                 'branch': branch,
@@ -773,7 +1240,7 @@ class NativeBridgeHandler(NSObject):
                 'clean': len(files) == 0,
             })
 
-        threading.Thread(target=do_status, daemon=True).start()
+        self.coordinator.git_pool.submit(do_status)
 
     def _handle_git_add(self, msg):
         """Stage files for commit."""
@@ -791,7 +1258,10 @@ class NativeBridgeHandler(NSObject):
             else:
                 self._send_response(request_id, {'success': False, 'error': r['stderr'].strip()})
 
-        threading.Thread(target=do_add, daemon=True).start()
+        self.coordinator.git_pool.submit(do_add)
+
+    # First line of `git commit` output: "[<branch> (root-commit) <abbrev hash>] <subject>"
+    _COMMIT_SUMMARY_RE = re.compile(r'\[[^\n]*? ([0-9a-f]{4,64})\] ')
 
     def _handle_git_commit(self, msg):
         """Create a git commit."""
@@ -805,11 +1275,16 @@ class NativeBridgeHandler(NSObject):
                 return
             r = self._run_git(['commit', '-m', message], path)
             if r['returncode'] == 0:
-                # Parse commit hash from output
-                commit_hash = ''
-                h = self._run_git(['rev-parse', '--short', 'HEAD'], path)
-                if h['returncode'] == 0:
-                    commit_hash = h['stdout'].strip()
+                # Parse commit hash from the summary line ("[main 1a2b3c4] subject");
+                # only ask rev-parse if the output doesn't have one
+                m = self._COMMIT_SUMMARY_RE.match(r['stdout'])
+                if m:
+                    commit_hash = m.group(1)
+                else:
+                    commit_hash = ''
+                    h = self._run_git(['rev-parse', '--short', 'HEAD'], path)
+                    if h['returncode'] == 0:
+                        commit_hash = h['stdout'].strip()
                 self._send_response(request_id, {
                     'success': True,
                     'hash': commit_hash,
@@ -818,7 +1293,7 @@ class NativeBridgeHandler(NSObject):
             else:
                 self._send_response(request_id, {'success': False, 'error': r['stderr'].strip() or r['stdout'].strip()})
 
-        threading.Thread(target=do_commit, daemon=True).start()
+        self.coordinator.git_pool.submit(do_commit)
 
     def _handle_git_log(self, msg):
         """Get recent git log entries."""
@@ -827,31 +1302,51 @@ class NativeBridgeHandler(NSObject):
         count = msg.get('count', 20)
 
         def do_log():
+            # History only changes when HEAD moves: reuse the last parse if it hasn't.
+            # HEAD is read from the ref files; git is only spawned when that can't resolve it.
+            head_sha = self._read_head_sha(path)
+            if not head_sha:
+                head = self._run_git(['rev-parse', 'HEAD'], path)
+                head_sha = head['stdout'].strip() if head['returncode'] == 0 else ''
+            cached = self._git_log_cache.get(path)
+            if head_sha and cached and cached[0] == head_sha and cached[1] == count:
+                self._send_response(request_id, {'success': True, 'commits': cached[2]})
+                return
+
+            # -z plus %x00 between fields: every field is NUL-separated, so one split
+            # yields a flat field list (no sentinel, and no field can contain a NUL)
             r = self._run_git([
-                'log', f'-{count}',
-                '--pretty=format:%H%n%h%n%an%n%ae%n%at%n%s%n---END---'
-            ], path)
+                'log', f'-{count}', '-z',
+                '--pretty=format:%H%x00%h%x00%an%x00%ae%x00%at%x00%s'
+            ], path, text=False)
             if r['returncode'] != 0:
                 self._send_response(request_id, {'success': False, 'error': r['stderr'].strip()})
                 return
 
-            commits = []
-            entries = r['stdout'].split('---END---')
-            for entry in entries:
-                lines = entry.strip().splitlines()
-                if len(lines) >= 6:
-                    commits.append({
-                        'hash': lines[0],
-                        'shortHash': lines[1],
-                        'author': lines[2],
-                        'email': lines[3],
-                        'timestamp': int(lines[4]),
-                        'message': lines[5],
-                    })
-
+            commits = self._parse_log_z(r['stdout'])
+            if head_sha:
+                self._git_log_cache[path] = (head_sha, count, commits)
             self._send_response(request_id, {'success': True, 'commits': commits})
 
-        threading.Thread(target=do_log, daemon=True).start()
+        self.coordinator.git_pool.submit(do_log)
+
+    @staticmethod
+    def _parse_log_z(stdout: bytes) -> list:
+        """Parse `git log -z` output with six %x00-separated fields per commit."""
+        # Parse in bytes; only the text fields get decoded
+        commits = []
+        fields = stdout.split(b'\x00')
+        for i in range(0, len(fields) - 5, 6):
+            full, short, author, email, ts, subject = fields[i:i + 6]
+            commits.append({
+                'hash': full.decode('ascii'),
+                'shortHash': short.decode('ascii'),
+                'author': author.decode('utf-8', errors='replace'),
+                'email': email.decode('utf-8', errors='replace'),
+                'timestamp': int(ts),
+                'message': subject.decode('utf-8', errors='replace'),
+            })
+        return commits
 
     def _handle_git_diff(self, msg):
         """Get diff output."""
@@ -872,7 +1367,7 @@ class NativeBridgeHandler(NSObject):
             else:
                 self._send_response(request_id, {'success': False, 'error': r['stderr'].strip()})
 
-        threading.Thread(target=do_diff, daemon=True).start()
+        self.coordinator.git_pool.submit(do_diff)
 
     def _handle_git_branch(self, msg):
         """List branches or get current branch."""
@@ -902,7 +1397,7 @@ class NativeBridgeHandler(NSObject):
                 'current': current,
             })
 
-        threading.Thread(target=do_branch, daemon=True).start()
+        self.coordinator.git_pool.submit(do_branch)
 
     def _handle_ops_agent_refresh(self, data: dict):
         """Handle log list refresh request."""
@@ -923,9 +1418,7 @@ class NativeBridgeHandler(NSObject):
                     }}
                 }});
                 """
-                def do_eval():
-                    self.coordinator.webview.evaluateJavaScript_completionHandler_(js, None)
-                NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+                self.coordinator.eval_js_batched(js)
         except Exception as e:
             print(f"[OpsAgent] Refresh error: {e}")
 
@@ -949,9 +1442,7 @@ class NativeBridgeHandler(NSObject):
                     }}
                 }});
                 """
-                def do_eval():
-                    self.coordinator.webview.evaluateJavaScript_completionHandler_(js, None)
-                NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+                self.coordinator.eval_js_batched(js)
         except Exception as e:
             print(f"[OpsAgent] Select log error: {e}")
 
@@ -988,9 +1479,7 @@ class NativeBridgeHandler(NSObject):
                     }}
                 }});
                 """
-                def do_eval_merged(js_code=merged_log_js):
-                    self.coordinator.webview.evaluateJavaScript_completionHandler_(js_code, None)
-                NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval_merged)
+                self.coordinator.eval_js_batched(merged_log_js)
             
             # Construct analysis prompt with file path reference (per design spec)
             analysis_prompt = f"""{context_prompt}
@@ -1019,15 +1508,10 @@ class NativeBridgeHandler(NSObject):
                     'opsAgentTabId': ops_agent_tab_id,
                     'autoSendMessage': analysis_prompt,
                 }, ensure_ascii=False)
-                b64 = base64.b64encode(payload.encode('utf-8')).decode('ascii')
                 create_worker_js = f"""
                 if (window.__createOpsAgentWorker) {{
                     try {{
-                        var b = atob('{b64}');
-                        var a = new Uint8Array(b.length);
-                        for (var i = 0; i < b.length; i++) a[i] = b.charCodeAt(i);
-                        var text = new TextDecoder('utf-8').decode(a);
-                        var data = JSON.parse(text);
+                        var data = {payload};
                         window.__createOpsAgentWorker(data);
                         console.log('[OpsAgent] Created/reused worker for Ops Agent:', data.opsAgentTabId);
                     }} catch(e) {{ 
@@ -1035,9 +1519,7 @@ class NativeBridgeHandler(NSObject):
                     }}
                 }}
                 """
-                def do_eval_worker(js_code=create_worker_js):
-                    self.coordinator.webview.evaluateJavaScript_completionHandler_(js_code, None)
-                NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval_worker)
+                self.coordinator.eval_js_batched(create_worker_js)
             
             # Send completion message
             message = f"已创建 Worker 并发送分析请求"
@@ -1065,9 +1547,7 @@ class NativeBridgeHandler(NSObject):
                 }}
             }});
             """
-            def do_eval():
-                self.coordinator.webview.evaluateJavaScript_completionHandler_(js, None)
-            NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+            self.coordinator.eval_js_batched(js)
 
     def _send_ops_agent_complete(self, success: bool, message: str, ops_agent_tab_id: str = ''):
         """Send completion message to frontend."""
@@ -1085,9 +1565,7 @@ class NativeBridgeHandler(NSObject):
                 }}
             }});
             """
-            def do_eval():
-                self.coordinator.webview.evaluateJavaScript_completionHandler_(js, None)
-            NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+            self.coordinator.eval_js_batched(js)
 
     def _handle_ops_agent_save_state(self, data: dict):
         """Save Ops Agent state to project-specific config."""
@@ -1141,9 +1619,7 @@ class NativeBridgeHandler(NSObject):
                     }}
                 }});
                 """
-                def do_eval():
-                    self.coordinator.webview.evaluateJavaScript_completionHandler_(js, None)
-                NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+                self.coordinator.eval_js_batched(js)
         except Exception as e:
             print(f"[OpsAgent] Load state error: {e}")
 
@@ -1215,9 +1691,7 @@ class NativeBridgeHandler(NSObject):
                             opsIframe.contentWindow.refreshLogList();
                         }
                         """
-                        def do_eval():
-                            self.coordinator.webview.evaluateJavaScript_completionHandler_(js, None)
-                        NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+                        self.coordinator.eval_js_batched(js)
                     
                     print(f"[OpsAgent] Added {len(file_paths)} log file(s)")
                 except Exception as e:
@@ -1265,24 +1739,19 @@ class NativeBridgeHandler(NSObject):
         """Send response back to WebView."""
         if not self.coordinator or not self.coordinator.webview:
             return
+        # JSON is a valid JS expression, so the payload is embedded as an object
+        # literal directly — no base64/atob/TextDecoder/JSON.parse round-trip.
         payload = json.dumps({'requestId': request_id, **data}, ensure_ascii=False)
-        b64 = base64.b64encode(payload.encode('utf-8')).decode('ascii')
         js = f"""
         if (window.__nativeBridgeResponse) {{
             try {{
-                var b = atob('{b64}');
-                var a = new Uint8Array(b.length);
-                for (var i = 0; i < b.length; i++) a[i] = b.charCodeAt(i);
-                var text = new TextDecoder('utf-8').decode(a);
-                window.__nativeBridgeResponse(JSON.parse(text));
+                window.__nativeBridgeResponse({payload});
             }} catch (e) {{
-                console.error('[NativeBridge] Failed to parse response:', e);
+                console.error('[NativeBridge] Failed to handle response:', e);
             }}
         }}
         """
-        def do_eval():
-            self.coordinator.webview.evaluateJavaScript_completionHandler_(js, None)
-        NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+        self.coordinator.eval_js_batched(js)
 
 
 # ─── App Coordinator ───────────────────────────────────────────────
@@ -1297,31 +1766,70 @@ class AppCoordinator:
         self.log_textview = None  # NSTextView for message log
         self._log_auto_scroll = True
         self._log_max_entries = 2000
-        self._log_entry_count = 0
+        self._log_entry_lengths = deque()  # UTF-16 length of each entry in the log view
+        self._log_pending = []  # (line, attributes) waiting for _flush_log
+        self._log_pending_lock = threading.Lock()
+        self._log_flush_scheduled = False
+        self._log_trim_scheduled = False  # main thread only
+        self._log_ts = (0, '')  # (epoch second, formatted HH:MM:SS) last used by log()
         self._terminal_ready = False
         self._review_terminal_ready = False
-        self._pending_callbacks = {}  # {callback_id: {'pattern': 'shell'|'droid', 'buffer': '', 'created_at': float}}
-        self._review_pending_callbacks = {}  # {callback_id: {'pattern': 'shell'|'droid', 'buffer': '', 'created_at': float}}
+        self._pending_callbacks = {}  # {callback_id: new_callback_info(...)}
+        self._review_pending_callbacks = {}  # {callback_id: new_callback_info(...)}
         self._change_pending_callbacks = {}  # {tab_id: {callback_id: {...}}}
-        self._CB_MAX_BUFFER = 512 * 1024  # 512KB max per callback buffer
+        # Callback payloads are the last 10000 chars (≤ 40000 UTF-8 bytes); buffers keep
+        # that much and are trimmed back once they reach twice it
+        self._CB_KEEP_BYTES = 40000
+        self._CB_MAX_BUFFER = 2 * self._CB_KEEP_BYTES
         self._CB_TIMEOUT_SECS = 300  # 5 min timeout for stale callbacks
         # Track active sessions for persistence
         self.active_change_sessions = {}  # {tab_id: {'sessionId': str, 'changeId': str|None}}
         self.active_codex_sessions = {}  # {tab_id: {'sessionId': str, 'changeId': str|None}}
         # Track active Auto Fix windows
         self._autofix_windows = set()
+        self._session_save_timer = None
+        self._session_save_lock = threading.Lock()
         self._start_callback_purge_timer()
         # Batched terminal output forwarding to reduce evaluateJavaScript pressure
-        self._main_output_batch = bytearray()
-        self._main_output_lock = threading.Lock()
-        self._main_output_scheduled = False
-        self._review_output_batch = bytearray()
-        self._review_output_lock = threading.Lock()
-        self._review_output_scheduled = False
-        self._change_output_batches = {}  # {tab_id: bytearray}
-        self._change_output_locks = {}    # {tab_id: Lock}
-        self._change_output_scheduled = {}  # {tab_id: bool}
+        self._output_pending = {}  # {output JS templates: bytearray}, all terminals
+        self._change_output_js_templates = {}  # {tab_id: (bytes JS, text JS) templates}
+        self._output_lock = threading.Condition()
+        self._output_full = False  # a buffer passed _BATCH_MAX_BYTES; flush without waiting
         self._BATCH_INTERVAL = 0.016  # ~60fps
+        self._BATCH_MAX_BYTES = 256 * 1024  # flush early past this to bound latency
+        threading.Thread(target=self._output_flush_loop, daemon=True, name='pty-output').start()
+        # Shared, bounded worker pool for git requests from the web app
+        self.git_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='git')
+        # Directory listings run here so a slow volume never stalls the main thread
+        self.fs_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='fs')
+        # Scripts waiting for the next main-queue hop (see eval_js_batched)
+        self._pending_js = []
+        self._pending_js_lock = threading.Lock()
+        self._pending_js_scheduled = False
+
+    # ─── Batched JS Evaluation ──────────────────────────────────────
+
+    def eval_js_batched(self, js: str):
+        """Queue a script for the main webview; all scripts queued before the
+        main queue gets to them run in a single evaluateJavaScript call."""
+        if not self.webview:
+            return
+        # Isolate each script so one failure can't skip the rest of the batch
+        js = f"try {{\n{js}\n}} catch (e) {{ console.error('[NativeBridge] script error:', e); }}"
+        with self._pending_js_lock:
+            self._pending_js.append(js)
+            if self._pending_js_scheduled:
+                return
+            self._pending_js_scheduled = True
+        NSOperationQueue.mainQueue().addOperationWithBlock_(self._flush_pending_js)
+
+    def _flush_pending_js(self):
+        with self._pending_js_lock:
+            scripts = self._pending_js
+            self._pending_js = []
+            self._pending_js_scheduled = False
+        if scripts:
+            self.webview.evaluateJavaScript_completionHandler_('\n'.join(scripts), None)
 
     # ─── Log Panel (NSTextView) ─────────────────────────────────────
 
@@ -1334,6 +1842,22 @@ class AppCoordinator:
         'info':     ('ℹ INFO',     0.53, 0.53, 0.67),  # gray
     }
 
+    _log_format_cache = None  # direction → (padded label, NSDictionary), built on first use
+
+    @classmethod
+    def _log_formats(cls):
+        """Padded label and text attributes per log direction, sharing one font."""
+        if cls._log_format_cache is None:
+            font = NSFont.fontWithName_size_('Menlo', 11.0) or NSFont.monospacedSystemFontOfSize_weight_(11.0, 0)
+            cls._log_format_cache = {
+                direction: (f'{label:<12}', NSDictionary.dictionaryWithDictionary_({
+                    NSFontAttributeName: font,
+                    NSForegroundColorAttributeName: NSColor.colorWithCalibratedRed_green_blue_alpha_(r, g, b, 1.0),
+                }))
+                for direction, (label, r, g, b) in cls._LOG_STYLES.items()
+            }
+        return cls._log_format_cache
+
     def log(self, direction: str, msg_type: str, detail: str = ''):
         """Append a log entry to the NSTextView log panel.
         direction: 'send' | 'recv' | 'callback' | 'hook' | 'info'
@@ -1346,47 +1870,79 @@ class AppCoordinator:
             detail = detail[:500] + '...'
 
         # Build formatted line
-        ts = time.strftime('%H:%M:%S', time.localtime())
-        ms = f'{int(time.time() * 1000) % 1000:03d}'
-        label, r, g, b = self._LOG_STYLES.get(direction, ('ℹ INFO', 0.53, 0.53, 0.67))
-        line = f'{ts}.{ms}  {label:<12} {msg_type:<24} {detail}\n'
-
-        # Build attributed string
-        attrs = {
-            NSFontAttributeName: NSFont.fontWithName_size_('Menlo', 11.0) or NSFont.monospacedSystemFontOfSize_weight_(11.0, 0),
-            NSForegroundColorAttributeName: NSColor.colorWithCalibratedRed_green_blue_alpha_(r, g, b, 1.0),
-        }
-        attr_str = NSAttributedString.alloc().initWithString_attributes_(line, attrs)
-
-        def do_append():
-            tv = self.log_textview
-            if not tv:
+        formats = self._log_formats()
+        label, attrs = formats.get(direction) or formats['info']
+        now = time.time()
+        sec = int(now)
+        # The HH:MM:SS part only changes once a second; one tuple so threads can share it
+        ts_sec, ts = self._log_ts
+        if sec != ts_sec:
+            ts = time.strftime('%H:%M:%S', time.localtime(sec))
+            self._log_ts = (sec, ts)
+        line = f'{ts}.{int((now - sec) * 1000):03d}  {label} {msg_type:<24} {detail}\n'
+
+        # Entries logged before the main queue gets to them are appended together
+        with self._log_pending_lock:
+            self._log_pending.append((line, attrs))
+            if self._log_flush_scheduled:
                 return
-            storage = tv.textStorage()
-            storage.beginEditing()
-            storage.appendAttributedString_(attr_str)
-            self._log_entry_count += 1
-            # Trim old entries (approximate: each entry is one line)
-            if self._log_entry_count > self._log_max_entries:
-                text = storage.string()
-                # Find the position after the first 200 lines to trim in bulk
-                trim_count = 200
-                pos = 0
-                for _ in range(trim_count):
-                    idx = text.find('\n', pos)
-                    if idx == -1:
-                        break
-                    pos = idx + 1
-                if pos > 0:
-                    storage.deleteCharactersInRange_(NSMakeRange(0, pos))
-                    self._log_entry_count -= trim_count
-            storage.endEditing()
-            # Auto-scroll to bottom
-            if self._log_auto_scroll:
-                end = storage.length()
-                tv.scrollRangeToVisible_(NSMakeRange(end, 0))
-
-        NSOperationQueue.mainQueue().addOperationWithBlock_(do_append)
+            self._log_flush_scheduled = True
+        NSOperationQueue.mainQueue().addOperationWithBlock_(self._flush_log)
+
+    def _flush_log(self):
+        """Append all pending log entries in one editing pass (main thread)."""
+        with self._log_pending_lock:
+            entries = self._log_pending
+            self._log_pending = []
+            self._log_flush_scheduled = False
+        tv = self.log_textview
+        if not tv or not entries:
+            return
+        # One string for the whole batch; attributes are then set once per run of
+        # same-direction entries. Ranges are in UTF-16 units, like NSString.
+        lengths = [len(line.encode('utf-16-le')) // 2 for line, _attrs in entries]
+        batch = NSMutableAttributedString.alloc().initWithString_attributes_(
+            ''.join(line for line, _attrs in entries), entries[0][1])
+        run_start = pos = 0
+        run_attrs = entries[0][1]
+        for (_line, attrs), length in zip(entries, lengths):
+            if attrs is not run_attrs:
+                if run_start:  # the first run already has the initial attributes
+                    batch.setAttributes_range_(run_attrs, NSMakeRange(run_start, pos - run_start))
+                run_start, run_attrs = pos, attrs
+            pos += length
+        if run_start:
+            batch.setAttributes_range_(run_attrs, NSMakeRange(run_start, pos - run_start))
+        storage = tv.textStorage()
+        storage.beginEditing()
+        storage.appendAttributedString_(batch)
+        self._log_entry_lengths.extend(lengths)
+        storage.endEditing()
+        # Auto-scroll to bottom
+        if self._log_auto_scroll:
+            end = storage.length()
+            tv.scrollRangeToVisible_(NSMakeRange(end, 0))
+        # Trimming leaves 200 entries of headroom, so it runs at most once per 200
+        # entries, in its own main-queue turn after the new text is on screen
+        if len(self._log_entry_lengths) > self._log_max_entries and not self._log_trim_scheduled:
+            self._log_trim_scheduled = True
+            NSOperationQueue.mainQueue().addOperationWithBlock_(self._trim_log)
+
+    def _trim_log(self):
+        """Drop the oldest log entries back below the cap (main thread)."""
+        self._log_trim_scheduled = False
+        tv = self.log_textview
+        lengths = self._log_entry_lengths
+        if not tv or len(lengths) <= self._log_max_entries:
+            return
+        trim_count = len(lengths) - self._log_max_entries + 200
+        pos = sum(lengths.popleft() for _ in range(trim_count))
+        storage = tv.textStorage()
+        storage.beginEditing()
+        storage.deleteCharactersInRange_(NSMakeRange(0, pos))
+        storage.endEditing()
+        if self._log_auto_scroll:
+            tv.scrollRangeToVisible_(NSMakeRange(storage.length(), 0))
 
     def log_clear(self):
         """Clear all log entries."""
@@ -1397,7 +1953,7 @@ class AppCoordinator:
             storage.beginEditing()
             storage.deleteCharactersInRange_(NSMakeRange(0, storage.length()))
             storage.endEditing()
-            self._log_entry_count = 0
+            self._log_entry_lengths.clear()
         NSOperationQueue.mainQueue().addOperationWithBlock_(do_clear)
 
     def log_toggle_auto_scroll(self):
@@ -1405,6 +1961,50 @@ class AppCoordinator:
         self._log_auto_scroll = not self._log_auto_scroll
         return self._log_auto_scroll
 
+    # ─── Session Persistence ───────────────────────────────────────
+
+    SESSION_SAVE_DELAY = 0.5  # Debounce window for session tracking changes
+
+    def schedule_session_save(self):
+        """Persist active sessions shortly after the last tracking change, so they
+        survive a force-quit and shutdown has nothing left to do."""
+        with self._session_save_lock:
+            if self._session_save_timer is not None:
+                self._session_save_timer.cancel()
+            self._session_save_timer = threading.Timer(self.SESSION_SAVE_DELAY, self.save_active_sessions)
+            self._session_save_timer.daemon = True
+            self._session_save_timer.start()
+
+    def save_active_sessions(self):
+        """Save active worker sessions to config for restoration on next launch."""
+        try:
+            config = load_config()
+            
+            # list() snapshots: the tracking handlers mutate these on the main thread
+            change_tabs = [
+                {'sessionId': info['sessionId'], 'changeId': info.get('changeId')}
+                for info in list(self.active_change_sessions.values())
+                if info.get('sessionId')
+            ]
+            codex_tabs = [
+                {'sessionId': info['sessionId'], 'changeId': info.get('changeId')}
+                for info in list(self.active_codex_sessions.values())
+                if info.get('sessionId')
+            ]
+
+            active_sessions = {
+                'changeTabs': change_tabs,
+                'codexTabs': codex_tabs,
+            }
+            # Nothing to write if the stored snapshot already matches
+            if config.get('activeSessions') == active_sessions:
+                return
+            config['activeSessions'] = active_sessions
+            save_config(config)
+            print(f"Active sessions saved: {len(change_tabs)} droid, {len(codex_tabs)} codex")
+        except Exception as e:
+            print(f"Failed to save active sessions: {e}")
+
     # ─── Terminal ───────────────────────────────────────────────────
 
     def start_terminal(self, cols=80, rows=24):
@@ -1422,12 +2022,7 @@ class AppCoordinator:
 
     def run_command_with_callback(self, command: str, callback_id: str, prompt_pattern: str = 'shell'):
         """Run a command and call back when prompt is detected again."""
-        self._pending_callbacks[callback_id] = {
-            'pattern': prompt_pattern,
-            'buffer': '',
-            'command': command,
-            'created_at': time.time(),
-        }
+        self._pending_callbacks[callback_id] = self.new_callback_info(prompt_pattern, command)
         self.log('send', 'runCommandWithCallback', f'{command}  [cb={callback_id}, wait={prompt_pattern}]')
         self.terminal.write((command + '\n').encode('utf-8'))
 
@@ -1438,20 +2033,110 @@ class AppCoordinator:
         else:
             self.terminal.resize(cols, rows)
 
-    # ANSI escape sequence pattern for stripping from prompt detection
-    _ansi_re = re.compile(r'\x1b\[[0-9;]*[a-zA-Z]|\x1b\].*?\x07|\x1b\[.*?\x07|\x1b[()][AB012]|\x1b\[\?[0-9;]*[hl]')
+    # ANSI escape sequence pattern for stripping from prompt detection, compiled once
+    # per class. The BEL-terminated arms match up to the next BEL on the same line.
+    _ansi_re = re.compile(r'\x1b\[[0-9;]*[a-zA-Z]|\x1b\][^\x07\n]*\x07|\x1b\[[^\x07\n]*\x07|\x1b[()][AB012]|\x1b\[\?[0-9;]*[hl]')
+
+    # An escape sequence cut off at the end of a chunk (completed by the next one)
+    _ansi_partial_re = re.compile(r'\x1b(?:\[[0-9;?]*|\][^\x07]{0,256}|[()])?\Z')
+
+    # Prompt pattern name → (characters that can end a prompt, literal anchor),
+    # resolved once when a callback is registered.
+    # Shell: ends with $, %, ❯, > (with optional trailing whitespace).
+    # Droid: ends with >, ❯, or contains "How can I help".
+    _prompt_specs = {
+        'shell': (('$', '%', '❯', '>'), None),
+        'droid': (('>', '❯'), 'How can I help'),
+    }
+
+    # Raw output kept per callback for prompt detection: room for the 200 visible
+    # chars that are checked plus the escape sequences around them
+    _PROMPT_TAIL_CHARS = 1024
 
-    # Shell prompt patterns: ends with $, %, ❯, > (with optional trailing space)
-    _shell_prompt_re = re.compile(r'[$%❯>]\s*$')
-    # Droid prompt patterns: ends with >, ❯, or contains "How can I help"
-    _droid_prompt_re = re.compile(r'[>❯]\s*$|How can I help')
+    def new_callback_info(self, prompt_pattern: str, command: str) -> dict:
+        """Build the pending-callback record used for prompt detection."""
+        return {
+            'pattern': prompt_pattern,
+            'prompt': self._prompt_specs.get(prompt_pattern),
+            'buffer': bytearray(),
+            'raw_tail': '',  # last _PROMPT_TAIL_CHARS chars of output, escapes included
+            'command': command,
+            'created_at': time.time(),
+        }
 
     def _cap_callback_buffer(self, cb_info):
         """Cap callback buffer to prevent unbounded memory growth.
-        Only keeps the tail portion needed for prompt detection."""
+        Only keeps the tail portion that can end up in the callback payload."""
         buf = cb_info['buffer']
         if len(buf) > self._CB_MAX_BUFFER:
-            cb_info['buffer'] = buf[-self._CB_MAX_BUFFER:]
+            del buf[:-self._CB_KEEP_BYTES]
+
+    def _feed_callback(self, cb_info, data: bytes, text: str) -> bool:
+        """Append PTY output to a callback buffer and report whether its prompt appeared.
+
+        `text` is `data` decoded once by the terminal's output_decoder and shared
+        by all of its pending callbacks. Stripping escapes only removes characters,
+        so a chunk containing no prompt character (nor the anchor's last one) can't
+        complete a prompt: those chunks only extend the raw tail, and the tail is
+        ANSI-stripped just for the chunks that pass.
+        """
+        buf = cb_info['buffer']
+        buf.extend(data)
+        self._cap_callback_buffer(cb_info)
+        prompt = cb_info['prompt']
+        if not prompt:
+            return False
+        prompt_chars, anchor = prompt
+        raw_tail = (cb_info['raw_tail'] + text)[-self._PROMPT_TAIL_CHARS:]
+        cb_info['raw_tail'] = raw_tail
+        if (not any(c in text for c in prompt_chars)
+                and not (anchor and anchor[-1] in text)):
+            return False
+        tail = self._clean_tail(raw_tail)
+        return tail.rstrip().endswith(prompt_chars) or bool(anchor and anchor in tail)
+
+    def _clean_tail(self, raw_tail: str) -> str:
+        """Return the last 200 chars of raw_tail with ANSI escape sequences removed.
+
+        A sequence still incomplete at the end (the next chunk completes it) is
+        dropped too, so it can't hide a prompt printed just before it.
+        """
+        if '\x1b' in raw_tail:
+            raw_tail = self._ansi_re.sub('', raw_tail)
+            esc = raw_tail.rfind('\x1b')
+            if esc != -1 and self._ansi_partial_re.match(raw_tail, esc):
+                raw_tail = raw_tail[:esc]
+        # Only the last 200 chars are checked to avoid false matches on old output
+        return raw_tail[-200:]
+
+    def _process_pty_chunk(self, pending, session, data: bytes, on_match):
+        """Feed a PTY chunk to a terminal's pending callbacks.
+
+        on_match(callback_id, output) is called for each callback whose prompt
+        appeared; those callbacks are then removed from `pending`.
+        """
+        # Decode every chunk, even with nothing pending, so a UTF-8 sequence split
+        # across chunks is never left half-fed for the next callback to inherit
+        text = session.output_decoder.decode(data)
+        if not pending:
+            return
+        # Snapshot: callbacks are registered from the main thread while this runs
+        # on the PTY reader thread. Completed ones are removed in the same pass.
+        for cb_id, cb_info in list(pending.items()):
+            if self._feed_callback(cb_info, data, text):
+                pending.pop(cb_id, None)
+                on_match(cb_id, self._callback_output(cb_info))
+
+    @staticmethod
+    def _callback_output(cb_info) -> str:
+        """Decode the accumulated output of a completed callback."""
+        return cb_info['buffer'].decode('utf-8', errors='replace')
+
+    @staticmethod
+    def _js_output_literal(output: str) -> str:
+        """Encode the tail of callback output as a JS string literal."""
+        # Truncate output to avoid JS string limits; JSON is a valid JS literal
+        return json.dumps(output[-10000:], ensure_ascii=False)
 
     def _purge_stale_callbacks(self):
         """Remove callbacks that have been pending longer than _CB_TIMEOUT_SECS."""
@@ -1496,52 +2181,18 @@ class AppCoordinator:
         self._send_to_webview(data)
 
         # Check pending callbacks for prompt detection
-        if self._pending_callbacks:
-            try:
-                text = data.decode('utf-8', errors='replace')
-            except Exception:
-                return
-
-            # Process each pending callback
-            completed = []
-            for cb_id, cb_info in self._pending_callbacks.items():
-                cb_info['buffer'] += text
-                self._cap_callback_buffer(cb_info)
-                # Strip ANSI escape sequences for clean prompt detection
-                clean = self._ansi_re.sub('', cb_info['buffer'])
-                # Only check the last 200 chars to avoid false matches on old output
-                tail = clean[-200:]
-
-                matched = False
-                if cb_info['pattern'] == 'shell':
-                    matched = bool(self._shell_prompt_re.search(tail))
-                elif cb_info['pattern'] == 'droid':
-                    matched = bool(self._droid_prompt_re.search(tail))
-
-                if matched:
-                    completed.append(cb_id)
-                    self._fire_callback(cb_id, cb_info['buffer'])
-
-            for cb_id in completed:
-                del self._pending_callbacks[cb_id]
+        self._process_pty_chunk(self._pending_callbacks, self.terminal, data, self._fire_callback)
 
     def _fire_callback(self, callback_id: str, output: str):
         """Notify web app that a command has completed."""
         if not self.webview:
             return
-        # Escape for JS string
-        safe_output = output.replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n').replace('\r', '\\r')
-        # Truncate output to avoid JS string limits
-        if len(safe_output) > 10000:
-            safe_output = safe_output[-10000:]
         js = f"""
         if (window.__onCommandCallback) {{
-            window.__onCommandCallback('{callback_id}', '{safe_output}');
+            window.__onCommandCallback({json.dumps(callback_id)}, {self._js_output_literal(output)});
         }}
         """
-        def do_eval():
-            self.webview.evaluateJavaScript_completionHandler_(js, None)
-        NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+        self.eval_js_batched(js)
         self.log('callback', 'command_complete', f'[{callback_id}]')
 
     def _on_terminal_exit(self, code: int):
@@ -1550,33 +2201,83 @@ class AppCoordinator:
         self._send_to_webview(msg.encode('utf-8'))
 
     def _send_to_webview(self, data: bytes):
-        if not self.webview:
-            return
-        with self._main_output_lock:
-            self._main_output_batch.extend(data)
-            if self._main_output_scheduled:
-                return
-            self._main_output_scheduled = True
+        self._queue_terminal_output(self._MAIN_OUTPUT_JS, data)
 
-        def flush():
-            with self._main_output_lock:
-                if not self._main_output_batch:
-                    self._main_output_scheduled = False
-                    return
-                chunk = bytes(self._main_output_batch)
-                self._main_output_batch.clear()
-                self._main_output_scheduled = False
-            b64 = base64.b64encode(chunk).decode('ascii')
-            js = f"""
-            if (window.__onTerminalOutputBytes) {{
-                window.__onTerminalOutputBytes('{b64}');
-            }}
-            """
-            def do_eval():
-                self.webview.evaluateJavaScript_completionHandler_(js, None)
-            NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+    # Max raw bytes per output script; a multiple of 3 so slices encode independently
+    _OUTPUT_B64_SLICE = 768 * 1024
+
+    # JS that hands a chunk (the %s) to a terminal's output handlers: a base64
+    # string for the bytes handler, a JS string literal for the text handler
+    _MAIN_OUTPUT_JS = (
+        "if (window.__onTerminalOutputBytes) window.__onTerminalOutputBytes('%s');",
+        "if (window.__onTerminalOutput) window.__onTerminalOutput(%s);",
+    )
+    _REVIEW_OUTPUT_JS = (
+        "if (window.__onReviewTerminalOutputBytes) window.__onReviewTerminalOutputBytes('%s');",
+        "if (window.__onReviewTerminalOutput) window.__onReviewTerminalOutput(%s);",
+    )
+
+    @staticmethod
+    def _change_output_js(tab_id: str) -> tuple:
+        key = json.dumps(tab_id).replace('%', '%%')
+        return tuple(
+            f"if (window.{table} && window.{table}[{key}]) window.{table}[{key}]({arg});"
+            for table, arg in (('__onChangeTerminalOutputBytes', "'%s'"), ('__onChangeTerminalOutput', '%s'))
+        )
 
-        threading.Timer(self._BATCH_INTERVAL, flush).start()
+    def _queue_terminal_output(self, js_template: tuple, data: bytes):
+        """Buffer PTY output for a terminal's JS handler; every terminal's output
+        is flushed together, once per _BATCH_INTERVAL.
+
+        Runs on the PTY reader threads, which only append: encoding happens on
+        the output flush thread so a reader goes straight back to the PTY.
+        """
+        if not self.webview:
+            return
+        with self._output_lock:
+            was_idle = not self._output_pending
+            buf = self._output_pending.get(js_template)
+            if buf is None:
+                buf = self._output_pending[js_template] = bytearray()
+            buf.extend(data)
+            if not self._output_full and len(buf) >= self._BATCH_MAX_BYTES:
+                self._output_full = True
+                self._output_lock.notify()
+            elif was_idle:
+                self._output_lock.notify()
+
+    def _output_flush_loop(self):
+        """Flush thread: wait for output, let a frame's worth accumulate, flush."""
+        while True:
+            with self._output_lock:
+                while not self._output_pending:
+                    self._output_lock.wait()
+                if not self._output_full:
+                    # Woken early if a buffer fills up during the interval
+                    self._output_lock.wait(self._BATCH_INTERVAL)
+            try:
+                self._flush_terminal_output()
+            except Exception as e:
+                print(f"[TerminalOutput] flush error: {e}")
+
+    def _flush_terminal_output(self):
+        with self._output_lock:
+            pending = self._output_pending
+            self._output_pending = {}
+            self._output_full = False
+        step = self._OUTPUT_B64_SLICE
+        for (bytes_js, text_js), buf in pending.items():
+            view = memoryview(buf)
+            if buf.isascii():
+                # Most output is plain ASCII: no UTF-8 to preserve, so skip base64
+                # and the page-side decode and hand xterm a string literal
+                for start in range(0, len(view), step):
+                    self.eval_js_batched(text_js % json.dumps(str(view[start:start + step], 'ascii')))
+                continue
+            # One C-level encode per slice; slicing keeps each atob() call bounded
+            for start in range(0, len(view), step):
+                b64 = base64.b64encode(view[start:start + step]).decode('ascii')
+                self.eval_js_batched(bytes_js % b64)
 
     # ─── Review Terminal ──────────────────────────────────────────
 
@@ -1585,9 +2286,12 @@ class AppCoordinator:
         if self.review_terminal._started:
             return
         self.log('info', 'start_review_terminal', f'Review PTY size {cols}x{rows}')
-        self.review_terminal.on_output = self._on_review_terminal_output
-        self.review_terminal.on_exit = self._on_review_terminal_exit
-        self.review_terminal.start(cols, rows)
+        session = self.review_terminal
+        # Bound to this session: stop_review_terminal() replaces self.review_terminal
+        # while the old reader may still be draining output
+        session.on_output = lambda data: self._on_review_terminal_output(session, data)
+        session.on_exit = self._on_review_terminal_exit
+        session.start(cols, rows)
         self._review_terminal_ready = True
 
     def write_to_review_terminal(self, text: str):
@@ -1595,12 +2299,7 @@ class AppCoordinator:
 
     def run_review_command_with_callback(self, command: str, callback_id: str, prompt_pattern: str = 'shell'):
         """Run a command in review terminal and call back when prompt is detected."""
-        self._review_pending_callbacks[callback_id] = {
-            'pattern': prompt_pattern,
-            'buffer': '',
-            'command': command,
-            'created_at': time.time(),
-        }
+        self._review_pending_callbacks[callback_id] = self.new_callback_info(prompt_pattern, command)
         self.log('send', 'runReviewCommandWithCallback', f'{command}  [cb={callback_id}, wait={prompt_pattern}]')
         self.review_terminal.write((command + '\n').encode('utf-8'))
 
@@ -1609,6 +2308,8 @@ class AppCoordinator:
         if self.review_terminal._alive:
             self.log('info', 'stop_review_terminal', 'Killing review PTY')
             self.review_terminal.kill()
+        else:
+            self.review_terminal.close()
         # Clear pending review callbacks
         self._review_pending_callbacks.clear()
         # Create a fresh session for next use
@@ -1621,77 +2322,28 @@ class AppCoordinator:
             self.log('info', 'resize_review_terminal', f'{cols}x{rows}')
             self.review_terminal.resize(cols, rows)
 
-    def _on_review_terminal_output(self, data: bytes):
+    def _on_review_terminal_output(self, session: TerminalSession, data: bytes):
         """Send review terminal output to the web app (batched)."""
         if not self.webview:
             return
 
-        # Batched forwarding to webview
-        with self._review_output_lock:
-            self._review_output_batch.extend(data)
-            if not self._review_output_scheduled:
-                self._review_output_scheduled = True
-                def flush_review():
-                    with self._review_output_lock:
-                        if not self._review_output_batch:
-                            self._review_output_scheduled = False
-                            return
-                        chunk = bytes(self._review_output_batch)
-                        self._review_output_batch.clear()
-                        self._review_output_scheduled = False
-                    b64 = base64.b64encode(chunk).decode('ascii')
-                    js = f"""
-                    if (window.__onReviewTerminalOutputBytes) {{
-                        window.__onReviewTerminalOutputBytes('{b64}');
-                    }}
-                    """
-                    def do_eval():
-                        self.webview.evaluateJavaScript_completionHandler_(js, None)
-                    NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
-                threading.Timer(self._BATCH_INTERVAL, flush_review).start()
-
-        # Check pending review callbacks for prompt detection
-        if self._review_pending_callbacks:
-            try:
-                text = data.decode('utf-8', errors='replace')
-            except Exception:
-                return
-
-            completed = []
-            for cb_id, cb_info in self._review_pending_callbacks.items():
-                cb_info['buffer'] += text
-                self._cap_callback_buffer(cb_info)
-                clean = self._ansi_re.sub('', cb_info['buffer'])
-                tail = clean[-200:]
+        self._queue_terminal_output(self._REVIEW_OUTPUT_JS, data)
 
-                matched = False
-                if cb_info['pattern'] == 'shell':
-                    matched = bool(self._shell_prompt_re.search(tail))
-                elif cb_info['pattern'] == 'droid':
-                    matched = bool(self._droid_prompt_re.search(tail))
-
-                if matched:
-                    completed.append(cb_id)
-                    self._fire_review_callback(cb_id, cb_info['buffer'])
-
-            for cb_id in completed:
-                del self._review_pending_callbacks[cb_id]
+        # Check pending review callbacks for prompt detection; they belong to the
+        # current session, so a replaced one only feeds its own decoder
+        pending = self._review_pending_callbacks if session is self.review_terminal else None
+        self._process_pty_chunk(pending, session, data, self._fire_review_callback)
 
     def _fire_review_callback(self, callback_id: str, output: str):
         """Notify web app that a review command has completed."""
         if not self.webview:
             return
-        safe_output = output.replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n').replace('\r', '\\r')
-        if len(safe_output) > 10000:
-            safe_output = safe_output[-10000:]
         js = f"""
         if (window.__onReviewCommandCallback) {{
-            window.__onReviewCommandCallback('{callback_id}', '{safe_output}');
+            window.__onReviewCommandCallback({json.dumps(callback_id)}, {self._js_output_literal(output)});
         }}
         """
-        def do_eval():
-            self.webview.evaluateJavaScript_completionHandler_(js, None)
-        NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+        self.eval_js_batched(js)
         self.log('callback', 'review_command_complete', f'[{callback_id}]')
 
     def _on_review_terminal_exit(self, code: int):
@@ -1704,9 +2356,7 @@ class AppCoordinator:
                 window.__onReviewTerminalExit({code});
             }}
             """
-            def do_eval():
-                self.webview.evaluateJavaScript_completionHandler_(js, None)
-            NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+            self.eval_js_batched(js)
 
     # ─── Change Terminals (Multiple Independent Sessions) ──────────
 
@@ -1716,11 +2366,20 @@ class AppCoordinator:
             return
         self.log('info', 'start_change_terminal', f'tab={tab_id}, size={cols}x{rows}')
         terminal = TerminalSession(shell='/bin/zsh')
-        terminal.on_output = lambda data: self._on_change_terminal_output(tab_id, data)
+        self._change_output_js_templates[tab_id] = self._change_output_js(tab_id)
+        # The output handler gets its own session, not a lookup by tab_id, so every
+        # chunk (including any read before start() returns) reaches this session's decoder
+        terminal.on_output = lambda data: self._on_change_terminal_output(tab_id, terminal, data)
         terminal.on_exit = lambda code: self._on_change_terminal_exit(tab_id, code)
-        terminal.start(cols, rows)
+        # Registered before start() so output read right away already finds them
         self.change_terminals[tab_id] = terminal
         self._change_pending_callbacks[tab_id] = {}
+        try:
+            terminal.start(cols, rows)
+        except Exception:
+            self.change_terminals.pop(tab_id, None)
+            self._change_pending_callbacks.pop(tab_id, None)
+            raise
 
     def write_to_change_terminal(self, tab_id: str, text: str):
         """Write input to a specific change terminal."""
@@ -1731,12 +2390,7 @@ class AppCoordinator:
         """Run a command in a change terminal and call back when prompt is detected."""
         if tab_id not in self._change_pending_callbacks:
             self._change_pending_callbacks[tab_id] = {}
-        self._change_pending_callbacks[tab_id][callback_id] = {
-            'pattern': prompt_pattern,
-            'buffer': '',
-            'command': command,
-            'created_at': time.time(),
-        }
+        self._change_pending_callbacks[tab_id][callback_id] = self.new_callback_info(prompt_pattern, command)
         self.log('send', 'runChangeCommandWithCallback', f'tab={tab_id}, cmd={command}, cb={callback_id}')
         if tab_id in self.change_terminals:
             self.change_terminals[tab_id].write((command + '\n').encode('utf-8'))
@@ -1750,104 +2404,46 @@ class AppCoordinator:
             if terminal._alive:
                 self.log('info', 'stop_change_terminal', f'tab={tab_id}, killing terminal (pid={terminal.pid})')
                 terminal.kill()
+            else:
+                terminal.close()
             del self.change_terminals[tab_id]
         else:
             self.log('warn', 'stop_change_terminal', f'tab={tab_id}, terminal NOT FOUND')
         if tab_id in self._change_pending_callbacks:
             del self._change_pending_callbacks[tab_id]
-        # Clean up batched output state
-        self._change_output_batches.pop(tab_id, None)
-        self._change_output_locks.pop(tab_id, None)
-        self._change_output_scheduled.pop(tab_id, None)
+        self._change_output_js_templates.pop(tab_id, None)
 
     def resize_change_terminal(self, tab_id: str, cols: int, rows: int):
         """Resize a change terminal."""
         if tab_id in self.change_terminals and self.change_terminals[tab_id]._started:
             self.change_terminals[tab_id].resize(cols, rows)
 
-    def _on_change_terminal_output(self, tab_id: str, data: bytes):
+    def _on_change_terminal_output(self, tab_id: str, session: TerminalSession, data: bytes):
         """Send change terminal output to the web app (batched)."""
         if not self.webview:
             return
 
-        # Batched forwarding to webview
-        if tab_id not in self._change_output_locks:
-            self._change_output_locks[tab_id] = threading.Lock()
-            self._change_output_batches[tab_id] = bytearray()
-            self._change_output_scheduled[tab_id] = False
-
-        lock = self._change_output_locks[tab_id]
-        with lock:
-            self._change_output_batches[tab_id].extend(data)
-            if not self._change_output_scheduled.get(tab_id, False):
-                self._change_output_scheduled[tab_id] = True
-                safe_tab_id = tab_id.replace('\\', '\\\\').replace("'", "\\'")
-                def flush_change(tid=tab_id, stid=safe_tab_id):
-                    lk = self._change_output_locks.get(tid)
-                    if not lk:
-                        return
-                    with lk:
-                        batch = self._change_output_batches.get(tid)
-                        if not batch:
-                            self._change_output_scheduled[tid] = False
-                            return
-                        chunk = bytes(batch)
-                        batch.clear()
-                        self._change_output_scheduled[tid] = False
-                    b64 = base64.b64encode(chunk).decode('ascii')
-                    js = f"""
-                    if (window.__onChangeTerminalOutputBytes && window.__onChangeTerminalOutputBytes['{stid}']) {{
-                        window.__onChangeTerminalOutputBytes['{stid}']('{b64}');
-                    }}
-                    """
-                    def do_eval():
-                        self.webview.evaluateJavaScript_completionHandler_(js, None)
-                    NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
-                threading.Timer(self._BATCH_INTERVAL, flush_change).start()
-
-        # Check pending callbacks for prompt detection
-        if tab_id in self._change_pending_callbacks and self._change_pending_callbacks[tab_id]:
-            try:
-                text = data.decode('utf-8', errors='replace')
-            except Exception:
-                return
+        js_template = self._change_output_js_templates.get(tab_id)
+        if js_template:
+            self._queue_terminal_output(js_template, data)
 
-            completed = []
-            for cb_id, cb_info in self._change_pending_callbacks[tab_id].items():
-                cb_info['buffer'] += text
-                self._cap_callback_buffer(cb_info)
-                clean = self._ansi_re.sub('', cb_info['buffer'])
-                tail = clean[-200:]
-
-                matched = False
-                if cb_info['pattern'] == 'shell':
-                    matched = bool(self._shell_prompt_re.search(tail))
-                elif cb_info['pattern'] == 'droid':
-                    matched = bool(self._droid_prompt_re.search(tail))
-
-                if matched:
-                    completed.append(cb_id)
-                    self._fire_change_callback(tab_id, cb_id, cb_info['buffer'])
-
-            for cb_id in completed:
-                del self._change_pending_callbacks[tab_id][cb_id]
+        # Check pending callbacks for prompt detection; a session that has since
+        # been replaced under this tab_id still feeds only its own decoder
+        pending = self._change_pending_callbacks.get(tab_id) if self.change_terminals.get(tab_id) is session else None
+        self._process_pty_chunk(pending, session, data,
+                                lambda cb_id, output: self._fire_change_callback(tab_id, cb_id, output))
 
     def _fire_change_callback(self, tab_id: str, callback_id: str, output: str):
         """Notify web app that a change terminal command has completed."""
         if not self.webview:
             return
-        safe_output = output.replace('\\', '\\\\').replace("'", "\\'").replace('\n', '\\n').replace('\r', '\\r')
-        if len(safe_output) > 10000:
-            safe_output = safe_output[-10000:]
-        safe_tab_id = tab_id.replace('\\', '\\\\').replace("'", "\\'")
+        safe_tab_id = json.dumps(tab_id)
         js = f"""
-        if (window.__onChangeCommandCallback && window.__onChangeCommandCallback['{safe_tab_id}']) {{
-            window.__onChangeCommandCallback['{safe_tab_id}']('{callback_id}', '{safe_output}');
+        if (window.__onChangeCommandCallback && window.__onChangeCommandCallback[{safe_tab_id}]) {{
+            window.__onChangeCommandCallback[{safe_tab_id}]({json.dumps(callback_id)}, {self._js_output_literal(output)});
         }}
         """
-        def do_eval():
-            self.webview.evaluateJavaScript_completionHandler_(js, None)
-        NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+        self.eval_js_batched(js)
         self.log('callback', 'change_command_complete', f'tab={tab_id}, cb={callback_id}')
 
     def _on_change_terminal_exit(self, tab_id: str, code: int):
@@ -1860,9 +2456,7 @@ class AppCoordinator:
                 window.__onChangeTerminalExit['{safe_tab_id}']({code});
             }}
             """
-            def do_eval():
-                self.webview.evaluateJavaScript_completionHandler_(js, None)
-            NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+            self.eval_js_batched(js)
 
     # ─── Confirmation Dialog ────────────────────────────────────────
 
@@ -1897,16 +2491,12 @@ class AppCoordinator:
                 uc.addScriptMessageHandler_name_(handler, "confirmationResult")
 
                 # Inject dialog data script BEFORE loading HTML to avoid race condition
-                data_json = json.dumps(dialog_data, ensure_ascii=False)
-                b64 = base64.b64encode(data_json.encode('utf-8')).decode('ascii')
+                # initDialog takes the JSON text; embed it as a JS string literal
+                data_json = json.dumps(json.dumps(dialog_data, ensure_ascii=False), ensure_ascii=False)
                 inject_js = f"""
                 setTimeout(function() {{
                     if (window.initDialog) {{
-                        var b = atob('{b64}');
-                        var a = new Uint8Array(b.length);
-                        for (var i = 0; i < b.length; i++) a[i] = b.charCodeAt(i);
-                        var text = new TextDecoder('utf-8').decode(a);
-                        window.initDialog(text);
+                        window.initDialog({data_json});
                     }}
                 }}, 100);
                 """
@@ -1949,23 +2539,16 @@ class AppCoordinator:
         if not self.webview:
             return
         payload = json.dumps({'requestId': request_id, **result}, ensure_ascii=False)
-        b64 = base64.b64encode(payload.encode('utf-8')).decode('ascii')
         js = f"""
         if (window.__nativeBridgeResponse) {{
             try {{
-                var b = atob('{b64}');
-                var a = new Uint8Array(b.length);
-                for (var i = 0; i < b.length; i++) a[i] = b.charCodeAt(i);
-                var text = new TextDecoder('utf-8').decode(a);
-                window.__nativeBridgeResponse(JSON.parse(text));
+                window.__nativeBridgeResponse({payload});
             }} catch (e) {{
                 console.error('[ConfirmationDialog] Failed to parse response:', e);
             }}
         }}
         """
-        def do_eval():
-            self.webview.evaluateJavaScript_completionHandler_(js, None)
-        NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+        self.eval_js_batched(js)
         self.log('callback', 'confirmation_result', f'requestId={request_id}, action={result.get("action")}')
 
     def open_autofix_window(self, change_id: str, project_path: str):
@@ -1987,21 +2570,14 @@ class AppCoordinator:
                 'droidTabId': droid_tab_id,
                 'changeId': change_id,
             }, ensure_ascii=False)
-            b64 = base64.b64encode(payload.encode('utf-8')).decode('ascii')
             js = f"""
             if (window.__onCreateAutoFixWorkers) {{
                 try {{
-                    var b = atob('{b64}');
-                    var a = new Uint8Array(b.length);
-                    for (var i = 0; i < b.length; i++) a[i] = b.charCodeAt(i);
-                    var text = new TextDecoder('utf-8').decode(a);
-                    window.__onCreateAutoFixWorkers(JSON.parse(text));
+                    window.__onCreateAutoFixWorkers({payload});
                 }} catch(e) {{ console.error('[AutoFix] create workers error:', e); }}
             }}
             """
-            def do_eval():
-                self.webview.evaluateJavaScript_completionHandler_(js, None)
-            NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+            self.eval_js_batched(js)
         
         # Then create and show the Auto Fix window
         autofix_window = AutoFixWindow(self, codex_tab_id, droid_tab_id, change_id, project_path)
@@ -2016,33 +2592,26 @@ class AppCoordinator:
         # Normalize event name: hook stdin uses 'hook_event_name', our old format used 'event'
         event_name = data.get('hook_event_name', data.get('event', 'unknown'))
         data['event'] = event_name
-        # Use base64 encoding to avoid all JS string escaping issues.
-        # The payload may contain arbitrary text (e.g. last_result with markdown,
-        # backticks, quotes, newlines, unicode) that would break inline JS strings.
+        # JSON is a valid JS expression, so the payload (which may hold arbitrary
+        # markdown, quotes, newlines, unicode) is embedded as an object literal
+        # directly — no base64/atob/TextDecoder/JSON.parse round-trip.
         try:
             payload_json = json.dumps(data, ensure_ascii=False)
         except (TypeError, ValueError) as e:
             print(f"[notify_web_refresh] JSON encode error: {e}")
             return
-        b64 = base64.b64encode(payload_json.encode('utf-8')).decode('ascii')
         js = f"""
         if (window.__onHookNotify) {{
             try {{
-                var b = atob('{b64}');
-                var a = new Uint8Array(b.length);
-                for (var i = 0; i < b.length; i++) a[i] = b.charCodeAt(i);
-                var text = new TextDecoder('utf-8').decode(a);
-                window.__onHookNotify(JSON.parse(text));
+                window.__onHookNotify({payload_json});
             }} catch(e) {{
-                console.error('[HookNotify] Failed to parse payload:', e);
+                console.error('[HookNotify] Failed to handle payload:', e);
             }}
         }} else {{
             console.warn('[HookNotify] window.__onHookNotify not defined');
         }}
         """
-        def do_eval():
-            self.webview.evaluateJavaScript_completionHandler_(js, None)
-        NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+        self.eval_js_batched(js)
         # Log to log panel (filter to safe keys only)
         log_keys = ('tool_name', 'session_id', 'reason', 'source', 'hook_event_name', 'event')
         log_data = {k: v for k, v in data.items() if k in log_keys}
@@ -2261,9 +2830,7 @@ class AppCoordinator:
                     window.__createOpsAgentTab({html_escaped});
                 }}
                 """
-                def do_eval():
-                    self.webview.evaluateJavaScript_completionHandler_(js, None)
-                NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+                self.eval_js_batched(js)
                 self.log('info', 'ops_agent', 'Ops Agent tab created')
                 
                 # Auto-refresh log list after tab creation
@@ -2286,9 +2853,7 @@ class AppCoordinator:
                     opsIframe.contentWindow.updateLogList({files_json});
                 }}
                 """
-                def do_eval_update(js_code=update_js):
-                    self.webview.evaluateJavaScript_completionHandler_(js_code, None)
-                NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval_update)
+                self.eval_js_batched(update_js)
             
             # Load saved state from project directory after refreshing log list
             time.sleep(0.2)  # Wait a bit more for UI to be ready
@@ -2310,9 +2875,7 @@ class AppCoordinator:
                     }}
                 }});
                 """
-                def do_eval_restore(js_code=restore_js):
-                    self.webview.evaluateJavaScript_completionHandler_(js_code, None)
-                NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval_restore)
+                self.eval_js_batched(restore_js)
         except Exception as e:
             print(f"[OpsAgent] Delayed refresh error: {e}")
 
@@ -2585,21 +3148,14 @@ class AutoFixWindow:
             'event': 'dismiss-confirmation-card',
             'codexTabId': self.codex_tab_id,
         }, ensure_ascii=False)
-        b64 = base64.b64encode(payload.encode('utf-8')).decode('ascii')
         js = f"""
         if (window.__onDismissConfirmationCard) {{
             try {{
-                var b = atob('{b64}');
-                var a = new Uint8Array(b.length);
-                for (var i = 0; i < b.length; i++) a[i] = b.charCodeAt(i);
-                var text = new TextDecoder('utf-8').decode(a);
-                window.__onDismissConfirmationCard(JSON.parse(text));
+                window.__onDismissConfirmationCard({payload});
             }} catch(e) {{ console.error('[AutoFix] dismiss card error:', e); }}
         }}
         """
-        def do_eval():
-            self.coordinator.webview.evaluateJavaScript_completionHandler_(js, None)
-        NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+        self.coordinator.eval_js_batched(js)
 
     def _start_loop(self):
         """Start the auto fix loop: wait for workers created by main webview to initialize."""
@@ -2712,17 +3268,12 @@ class AutoFixWindow:
             payload = json.dumps({
                 'tabId': self.codex_tab_id,
             }, ensure_ascii=False)
-            b64 = base64.b64encode(payload.encode('utf-8')).decode('ascii')
             # Escape tabId for safe JS string interpolation
             codex_tab_id_escaped = json.dumps(self.codex_tab_id)
             js = f"""
             if (window.__onAutoFixTriggerReReview) {{
                 try {{
-                    var b = atob('{b64}');
-                    var a = new Uint8Array(b.length);
-                    for (var i = 0; i < b.length; i++) a[i] = b.charCodeAt(i);
-                    var text = new TextDecoder('utf-8').decode(a);
-                    window.__onAutoFixTriggerReReview(JSON.parse(text));
+                    window.__onAutoFixTriggerReReview({payload});
                 }} catch(e) {{
                     console.error('[SelfReviewCycle] trigger re-review error:', e);
                     try {{
@@ -2740,9 +3291,7 @@ class AutoFixWindow:
                 }} catch(e2) {{}}
             }}
             """
-            def do_eval():
-                self.coordinator.webview.evaluateJavaScript_completionHandler_(js, None)
-            NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+            self.coordinator.eval_js_batched(js)
             return True
         except Exception as e:
             self.coordinator.log('error', 'autofix_trigger_review_failed',
@@ -2766,17 +3315,12 @@ class AutoFixWindow:
                 'items': items,
                 'scenarioKey': scenario_key,
             }, ensure_ascii=False)
-            b64 = base64.b64encode(payload.encode('utf-8')).decode('ascii')
             # Escape tabId for safe JS string interpolation
             droid_tab_id_escaped = json.dumps(self.droid_tab_id)
             js = f"""
             if (window.__onAutoFixDroidFix) {{
                 try {{
-                    var b = atob('{b64}');
-                    var a = new Uint8Array(b.length);
-                    for (var i = 0; i < b.length; i++) a[i] = b.charCodeAt(i);
-                    var text = new TextDecoder('utf-8').decode(a);
-                    window.__onAutoFixDroidFix(JSON.parse(text));
+                    window.__onAutoFixDroidFix({payload});
                 }} catch(e) {{
                     console.error('[SelfReviewCycle] trigger droid fix error:', e);
                     try {{
@@ -2794,9 +3338,7 @@ class AutoFixWindow:
                 }} catch(e2) {{}}
             }}
             """
-            def do_eval():
-                self.coordinator.webview.evaluateJavaScript_completionHandler_(js, None)
-            NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+            self.coordinator.eval_js_batched(js)
             return True
         except Exception as e:
             self.coordinator.log('error', 'autofix_trigger_droid_fix_failed',
@@ -3087,21 +3629,14 @@ class AutoFixWindow:
                 'cycles': self._cycle,
                 'changeId': self.change_id,
             }, ensure_ascii=False)
-            b64 = base64.b64encode(payload.encode('utf-8')).decode('ascii')
             js = f"""
             if (window.__onAutoFixComplete) {{
                 try {{
-                    var b = atob('{b64}');
-                    var a = new Uint8Array(b.length);
-                    for (var i = 0; i < b.length; i++) a[i] = b.charCodeAt(i);
-                    var text = new TextDecoder('utf-8').decode(a);
-                    window.__onAutoFixComplete(JSON.parse(text));
+                    window.__onAutoFixComplete({payload});
                 }} catch(e) {{ console.error('[AutoFix] parse error:', e); }}
             }}
             """
-            def do_eval():
-                self.coordinator.webview.evaluateJavaScript_completionHandler_(js, None)
-            NSOperationQueue.mainQueue().addOperationWithBlock_(do_eval)
+            self.coordinator.eval_js_batched(js)
 
     def stop(self):
         """Stop the auto fix loop."""
@@ -3234,6 +3769,236 @@ def build_log_panel(coordinator, frame):
     return container, text_view, actions
 
 
+# ─── Injected Bridge Script ────────────────────────────────────────
+
+# Static part of the user script installed in the main webview (console forwarding,
+# request/response plumbing and window.__nativeBridge). Per-launch values are
+# prepended by AppDelegate.
+BRIDGE_JS = """
+// Console log interceptor — forward JS logs to native log panel
+(function() {
+    var origLog = console.log, origWarn = console.warn, origError = console.error;
+    function forward(level, args) {
+        try {
+            var msg = Array.prototype.map.call(args, function(a) {
+                if (a instanceof Error) return a.message + '\\n' + a.stack;
+                if (typeof a === 'object') try { return JSON.stringify(a); } catch(e) { return String(a); }
+                return String(a);
+            }).join(' ');
+            if (window.webkit && window.webkit.messageHandlers && window.webkit.messageHandlers.nativeBridge) {
+                post('jsConsole', {level: level, message: msg.substring(0, 2000)});
+            }
+        } catch(e) {}
+    }
+    console.log = function() { forward('log', arguments); origLog.apply(console, arguments); };
+    console.warn = function() { forward('warn', arguments); origWarn.apply(console, arguments); };
+    console.error = function() { forward('error', arguments); origError.apply(console, arguments); };
+})();
+
+// Request/response tracking
+window.__nativePending = new Map();
+window.__nativeRequestId = 0;
+
+window.__nativeChunks = new Map();
+
+window.__nativeBridgeResponse = function(response) {
+    var id = response.requestId;
+    window.__nativeChunks.delete(id);
+    var resolve = window.__nativePending.get(id);
+    if (resolve) {
+        window.__nativePending.delete(id);
+        resolve(response);
+    }
+};
+
+// Large file reads arrive in pieces; resolve once the last one lands
+window.__nativeBridgeChunk = function(id, text, done) {
+    var parts = window.__nativeChunks.get(id);
+    if (!parts) {
+        parts = [];
+        window.__nativeChunks.set(id, parts);
+    }
+    parts.push(text);
+    if (done) {
+        window.__nativeBridgeResponse({requestId: id, success: true, content: parts.join('')});
+    }
+};
+
+// Fire-and-forget message to the native side
+function post(type, fields) {
+    var msg = fields || {};
+    msg.type = type;
+    window.webkit.messageHandlers.nativeBridge.postMessage(JSON.stringify(msg));
+}
+
+// Session tracking changes made in the same task reach native as one message
+var trackQueue = [];
+function queueTrack(type, fields) {
+    fields.type = type;
+    trackQueue.push(fields);
+    if (trackQueue.length === 1) {
+        queueMicrotask(function() {
+            var ops = trackQueue;
+            trackQueue = [];
+            post('trackBatch', {ops: ops});
+        });
+    }
+}
+
+function nativeRequest(msg) {
+    return new Promise(function(resolve) {
+        var id = ++window.__nativeRequestId;
+        msg.requestId = id;
+        window.__nativePending.set(id, resolve);
+        window.webkit.messageHandlers.nativeBridge.postMessage(JSON.stringify(msg));
+    });
+}
+
+// Main-terminal keystrokes are batched in the page; send them before any
+// bridge write to the same PTY so the two can't be reordered.
+function flushTerminalInput() {
+    if (window.__flushTerminalInput) window.__flushTerminalInput();
+}
+
+window.__nativeBridge = {
+    // Terminal commands
+    runCommand: function(cmd) {
+        flushTerminalInput();
+        post('runCommand', {command: cmd});
+    },
+    runCommandWithCallback: function(cmd, callbackId, promptPattern) {
+        flushTerminalInput();
+        post('runCommandWithCallback', {
+            command: cmd,
+            callbackId: callbackId,
+            promptPattern: promptPattern || 'shell'
+        });
+    },
+    writeInput: function(data) {
+        flushTerminalInput();
+        post('writeInput', {data: data});
+    },
+    startAgent: function(agentCmd) {
+        flushTerminalInput();
+        post('startAgent', {command: agentCmd});
+    },
+
+    // File system operations (return Promises)
+    pickDirectory: function() {
+        return nativeRequest({type: 'fs_pickDirectory'});
+    },
+    readDirectory: function(path) {
+        return nativeRequest({type: 'fs_readDirectory', path: path});
+    },
+    readFile: function(path) {
+        return nativeRequest({type: 'fs_readFile', path: path});
+    },
+    writeFile: function(path, content) {
+        return nativeRequest({type: 'fs_writeFile', path: path, content: content});
+    },
+
+    // Git operations (return Promises)
+    gitStatus: function(path) {
+        return nativeRequest({type: 'git_status', path: path});
+    },
+    gitAdd: function(path, files) {
+        return nativeRequest({type: 'git_add', path: path, files: files || ['.']});
+    },
+    gitCommit: function(path, message) {
+        return nativeRequest({type: 'git_commit', path: path, message: message});
+    },
+    gitLog: function(path, count) {
+        return nativeRequest({type: 'git_log', path: path, count: count || 20});
+    },
+    gitDiff: function(path, opts) {
+        opts = opts || {};
+        return nativeRequest({type: 'git_diff', path: path, staged: !!opts.staged, file: opts.file || null});
+    },
+    gitBranch: function(path) {
+        return nativeRequest({type: 'git_branch', path: path});
+    },
+
+    // Review terminal commands
+    startReviewTerminal: function(projectPath) {
+        post('startReviewTerminal', {projectPath: projectPath || ''});
+    },
+    writeReviewInput: function(data) {
+        post('writeReviewInput', {data: data});
+    },
+    runReviewCommandWithCallback: function(cmd, callbackId, promptPattern) {
+        post('runReviewCommandWithCallback', {
+            command: cmd,
+            callbackId: callbackId,
+            promptPattern: promptPattern || 'shell'
+        });
+    },
+    stopReviewTerminal: function() {
+        post('stopReviewTerminal');
+    },
+
+    // Change terminal commands (multi-session)
+    startChangeTerminal: function(tabId, cols, rows) {
+        post('startChangeTerminal', {tabId: tabId, cols: cols || 80, rows: rows || 24});
+    },
+    writeChangeInput: function(tabId, data) {
+        post('writeChangeInput', {tabId: tabId, data: data});
+    },
+    runChangeCommandWithCallback: function(tabId, cmd, callbackId, promptPattern) {
+        post('runChangeCommandWithCallback', {
+            tabId: tabId,
+            command: cmd,
+            callbackId: callbackId,
+            promptPattern: promptPattern || 'shell'
+        });
+    },
+    stopChangeTerminal: function(tabId) {
+        post('stopChangeTerminal', {tabId: tabId});
+    },
+
+    // Session tracking for persistence
+    trackChangeSession: function(tabId, sessionId, changeId) {
+        queueTrack('trackChangeSession', {tabId: tabId, sessionId: sessionId, changeId: changeId || null});
+    },
+    untrackChangeSession: function(tabId) {
+        queueTrack('untrackChangeSession', {tabId: tabId});
+    },
+    trackCodexSession: function(tabId, sessionId, changeId) {
+        queueTrack('trackCodexSession', {tabId: tabId, sessionId: sessionId, changeId: changeId || null});
+    },
+    untrackCodexSession: function(tabId) {
+        queueTrack('untrackCodexSession', {tabId: tabId});
+    },
+
+    // Confirmation dialog (opens independent native window, returns Promise)
+    showConfirmationDialog: function(data) {
+        return nativeRequest({type: 'showConfirmationDialog', data: data});
+    },
+
+    // Auto Fix window (opens independent sidebar window)
+    openAutoFixWindow: function(changeId, projectPath) {
+        post('openAutoFixWindow', {changeId: changeId, projectPath: projectPath});
+    },
+
+    // Ops Agent tab creation
+    createOpsAgentTab: function(projectPath) {
+        post('createOpsAgentTab', {projectPath: projectPath || ''});
+    }
+};
+"""
+
+_bridge_user_script = None
+
+
+def bridge_user_script():
+    """The WKUserScript for BRIDGE_JS, created once and shared by every webview config."""
+    global _bridge_user_script
+    if _bridge_user_script is None:
+        _bridge_user_script = WKUserScript.alloc().initWithSource_injectionTime_forMainFrameOnly_(
+            BRIDGE_JS, 0, True
+        )
+    return _bridge_user_script
+
+
 # ─── macOS App Delegate ────────────────────────────────────────────
 
 class AppDelegate(NSObject):
@@ -3241,8 +4006,8 @@ class AppDelegate(NSObject):
     def applicationDidFinishLaunching_(self, notification):
         self.coordinator = AppCoordinator()
         # Restore log panel visibility from last session (default: visible)
-        app_config_init = load_config()
-        self.log_visible = app_config_init.get('logPanelVisible', True)
+        app_config = load_config()
+        self.log_visible = app_config.get('logPanelVisible', True)
         
         # Start Vite dev server
         self.vite_process = start_vite_server()
@@ -3279,225 +4044,24 @@ class AppDelegate(NSObject):
         uc.addScriptMessageHandler_name_(self.bridge_handler, "terminalInput")
         uc.addScriptMessageHandler_name_(self.bridge_handler, "terminalResize")
 
-        # Load last opened directory and saved sessions
-        app_config = load_config()
+        # Last opened directory and saved sessions (from the config read above)
         last_dir = app_config.get('lastDirectory', '')
-        last_dir_js = last_dir.replace('\\', '\\\\').replace("'", "\\'")
         
         # Load saved sessions for restoration
         saved_sessions = app_config.get('activeSessions', {'changeTabs': [], 'codexTabs': []})
-        saved_sessions_json = json.dumps(saved_sessions, ensure_ascii=False).replace('\\', '\\\\').replace("'", "\\'")
-
-        inject_js = "window.__isNativeApp = true;\n"
-        inject_js += "window.__lastDirectory = '" + last_dir_js + "';\n"
-        inject_js += "window.__savedSessions = JSON.parse('" + saved_sessions_json + "');\n"
-        inject_js += """
-        // Console log interceptor — forward JS logs to native log panel
-        (function() {
-            var origLog = console.log, origWarn = console.warn, origError = console.error;
-            function forward(level, args) {
-                try {
-                    var msg = Array.prototype.map.call(args, function(a) {
-                        if (a instanceof Error) return a.message + '\\n' + a.stack;
-                        if (typeof a === 'object') try { return JSON.stringify(a); } catch(e) { return String(a); }
-                        return String(a);
-                    }).join(' ');
-                    if (window.webkit && window.webkit.messageHandlers && window.webkit.messageHandlers.nativeBridge) {
-                        window.webkit.messageHandlers.nativeBridge.postMessage(
-                            JSON.stringify({type: 'jsConsole', level: level, message: msg.substring(0, 2000)})
-                        );
-                    }
-                } catch(e) {}
-            }
-            console.log = function() { forward('log', arguments); origLog.apply(console, arguments); };
-            console.warn = function() { forward('warn', arguments); origWarn.apply(console, arguments); };
-            console.error = function() { forward('error', arguments); origError.apply(console, arguments); };
-        })();
-
-        // Request/response tracking
-        window.__nativePending = {};
-        window.__nativeRequestId = 0;
-        
-        window.__nativeBridgeResponse = function(response) {
-            var id = response.requestId;
-            if (window.__nativePending[id]) {
-                window.__nativePending[id](response);
-                delete window.__nativePending[id];
-            }
-        };
-        
-        function nativeRequest(msg) {
-            return new Promise(function(resolve) {
-                var id = ++window.__nativeRequestId;
-                msg.requestId = id;
-                window.__nativePending[id] = resolve;
-                window.webkit.messageHandlers.nativeBridge.postMessage(JSON.stringify(msg));
-            });
-        }
-        
-        window.__nativeBridge = {
-            // Terminal commands
-            runCommand: function(cmd) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'runCommand', command: cmd})
-                );
-            },
-            runCommandWithCallback: function(cmd, callbackId, promptPattern) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({
-                        type: 'runCommandWithCallback',
-                        command: cmd,
-                        callbackId: callbackId,
-                        promptPattern: promptPattern || 'shell'
-                    })
-                );
-            },
-            writeInput: function(data) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'writeInput', data: data})
-                );
-            },
-            startAgent: function(agentCmd) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'startAgent', command: agentCmd})
-                );
-            },
-            
-            // File system operations (return Promises)
-            pickDirectory: function() {
-                return nativeRequest({type: 'fs_pickDirectory'});
-            },
-            readDirectory: function(path) {
-                return nativeRequest({type: 'fs_readDirectory', path: path});
-            },
-            readFile: function(path) {
-                return nativeRequest({type: 'fs_readFile', path: path});
-            },
-            writeFile: function(path, content) {
-                return nativeRequest({type: 'fs_writeFile', path: path, content: content});
-            },
-            
-            // Git operations (return Promises)
-            gitStatus: function(path) {
-                return nativeRequest({type: 'git_status', path: path});
-            },
-            gitAdd: function(path, files) {
-                return nativeRequest({type: 'git_add', path: path, files: files || ['.']});
-            },
-            gitCommit: function(path, message) {
-                return nativeRequest({type: 'git_commit', path: path, message: message});
-            },
-            gitLog: function(path, count) {
-                return nativeRequest({type: 'git_log', path: path, count: count || 20});
-            },
-            gitDiff: function(path, opts) {
-                opts = opts || {};
-                return nativeRequest({type: 'git_diff', path: path, staged: !!opts.staged, file: opts.file || null});
-            },
-            gitBranch: function(path) {
-                return nativeRequest({type: 'git_branch', path: path});
-            },
-            
-            // Review terminal commands
-            startReviewTerminal: function(projectPath) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'startReviewTerminal', projectPath: projectPath || ''})
-                );
-            },
-            writeReviewInput: function(data) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'writeReviewInput', data: data})
-                );
-            },
-            runReviewCommandWithCallback: function(cmd, callbackId, promptPattern) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({
-                        type: 'runReviewCommandWithCallback',
-                        command: cmd,
-                        callbackId: callbackId,
-                        promptPattern: promptPattern || 'shell'
-                    })
-                );
-            },
-            stopReviewTerminal: function() {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'stopReviewTerminal'})
-                );
-            },
-            
-            // Change terminal commands (multi-session)
-            startChangeTerminal: function(tabId, cols, rows) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'startChangeTerminal', tabId: tabId, cols: cols || 80, rows: rows || 24})
-                );
-            },
-            writeChangeInput: function(tabId, data) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'writeChangeInput', tabId: tabId, data: data})
-                );
-            },
-            runChangeCommandWithCallback: function(tabId, cmd, callbackId, promptPattern) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({
-                        type: 'runChangeCommandWithCallback',
-                        tabId: tabId,
-                        command: cmd,
-                        callbackId: callbackId,
-                        promptPattern: promptPattern || 'shell'
-                    })
-                );
-            },
-            stopChangeTerminal: function(tabId) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'stopChangeTerminal', tabId: tabId})
-                );
-            },
-            
-            // Session tracking for persistence
-            trackChangeSession: function(tabId, sessionId, changeId) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'trackChangeSession', tabId: tabId, sessionId: sessionId, changeId: changeId || null})
-                );
-            },
-            untrackChangeSession: function(tabId) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'untrackChangeSession', tabId: tabId})
-                );
-            },
-            trackCodexSession: function(tabId, sessionId, changeId) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'trackCodexSession', tabId: tabId, sessionId: sessionId, changeId: changeId || null})
-                );
-            },
-            untrackCodexSession: function(tabId) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'untrackCodexSession', tabId: tabId})
-                );
-            },
-            
-            // Confirmation dialog (opens independent native window, returns Promise)
-            showConfirmationDialog: function(data) {
-                return nativeRequest({type: 'showConfirmationDialog', data: data});
-            },
-            
-            // Auto Fix window (opens independent sidebar window)
-            openAutoFixWindow: function(changeId, projectPath) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'openAutoFixWindow', changeId: changeId, projectPath: projectPath})
-                );
-            },
-            
-            // Ops Agent tab creation
-            createOpsAgentTab: function(projectPath) {
-                window.webkit.messageHandlers.nativeBridge.postMessage(
-                    JSON.stringify({type: 'createOpsAgentTab', projectPath: projectPath || ''})
-                );
-            }
-        };
-        """
+
+        # JSON is valid JS, so both values are embedded as literals (no escaping, no JSON.parse).
+        # ASCII output keeps U+2028/U+2029 escaped; compact separators trim the script.
+        prelude_js = (
+            "window.__isNativeApp = true;\n"
+            f"window.__lastDirectory = {json.dumps(last_dir)};\n"
+            f"window.__savedSessions = {json.dumps(saved_sessions, separators=(',', ':'))};\n"
+        )
+        # User scripts run in the order added: per-launch values, then the bridge
         uc.addUserScript_(WKUserScript.alloc().initWithSource_injectionTime_forMainFrameOnly_(
-            inject_js, 0, True
+            prelude_js, 0, True
         ))
+        uc.addUserScript_(bridge_user_script())
 
         self.webview = WKWebView.alloc().initWithFrame_configuration_(
             NSMakeRect(0, 0, w, int(h * 0.75)), config
@@ -3560,9 +4124,7 @@ class AppDelegate(NSObject):
             self.log_visible = True
             sender.setTitle_("Hide Log")
         # Persist visibility state
-        config = load_config()
-        config['logPanelVisible'] = self.log_visible
-        save_config(config)
+        update_config(logPanelVisible=self.log_visible)
 
     def showAbout_(self, sender):
         """Show About panel with large app icon."""
@@ -3641,56 +4203,34 @@ class AppDelegate(NSObject):
     def applicationWillTerminate_(self, notification):
         # Save active worker sessions before terminating
         if hasattr(self, 'coordinator'):
-            self._save_active_sessions()
+            self.coordinator.save_active_sessions()
             # Kill all change terminals
             for tab_id in list(self.coordinator.change_terminals.keys()):
                 self.coordinator.stop_change_terminal(tab_id)
             if self.coordinator.terminal:
                 self.coordinator.terminal.kill()
+            # Drop queued git/fs requests; don't block quit on in-flight ones
+            self.coordinator.git_pool.shutdown(wait=False, cancel_futures=True)
+            self.coordinator.fs_pool.shutdown(wait=False, cancel_futures=True)
+        # Write out any debounced config changes before the process exits
+        flush_config()
         # Stop Vite dev server
         if hasattr(self, 'vite_process') and self.vite_process:
             print("Stopping Vite dev server...")
+            # Started with start_new_session=True, so its process group id is its pid
+            pgid = self.vite_process.pid
             try:
-                os.killpg(os.getpgid(self.vite_process.pid), signal.SIGTERM)
-            except (ProcessLookupError, OSError):
+                os.killpg(pgid, signal.SIGTERM)
+                self.vite_process.wait(timeout=0.5)
+            except subprocess.TimeoutExpired:
+                try:
+                    os.killpg(pgid, signal.SIGKILL)
+                except OSError:
+                    pass
+            except OSError:
                 pass
-            try:
-                self.vite_process.terminate()
-                self.vite_process.wait(timeout=5)
-            except Exception:
-                self.vite_process.kill()
             print("Vite dev server stopped.")
 
-    def _save_active_sessions(self):
-        """Save active worker sessions to config for restoration on next launch."""
-        try:
-            config = load_config()
-            
-            change_tabs = []
-            for tab_id, info in self.coordinator.active_change_sessions.items():
-                if info.get('sessionId'):
-                    change_tabs.append({
-                        'sessionId': info['sessionId'],
-                        'changeId': info.get('changeId'),
-                    })
-            
-            codex_tabs = []
-            for tab_id, info in self.coordinator.active_codex_sessions.items():
-                if info.get('sessionId'):
-                    codex_tabs.append({
-                        'sessionId': info['sessionId'],
-                        'changeId': info.get('changeId'),
-                    })
-            
-            config['activeSessions'] = {
-                'changeTabs': change_tabs,
-                'codexTabs': codex_tabs,
-            }
-            save_config(config)
-            print(f"Active sessions saved: {len(change_tabs)} droid, {len(codex_tabs)} codex")
-        except Exception as e:
-            print(f"Failed to save active sessions: {e}")
-
 
 def main():
     # Set process name and bundle name so macOS menu bar shows "YinYang Spec" instead of "Python"
@@ -14,6 +14,11 @@ import re
 
 # ─── Checkbox Parsing (mirrors checkboxUtils.ts) ────────────────────
 
+# One pass per line for both states; group 1 is the box contents (whitespace or x/X)
+_CHECKBOX_RE = re.compile(r'^\s*-\s\[(\s|[xX])\]\s(.+)$')
+_PRIORITY_PREFIX_RE = re.compile(r'^[\s*_\[\]]+')
+_P0P1_RE = re.compile(r'\bP[01]\b')
+
 def parse_checkbox_items(text: str, trigger_to_skip: str | None = None):
     """Parse markdown text to extract checkbox items.
     
@@ -27,23 +32,22 @@ def parse_checkbox_items(text: str, trigger_to_skip: str | None = None):
     context_lines = []
     in_code_block = False
 
+    skip_prefix = trigger_to_skip.lower() if trigger_to_skip else None
+
     for line in text.split('\n'):
-        if line.strip().startswith('```'):
+        stripped = line.strip()
+        if stripped.startswith('```'):
             in_code_block = not in_code_block
             continue
         if in_code_block:
             continue
-        if trigger_to_skip and line.strip().lower().startswith(trigger_to_skip.lower()):
+        if skip_prefix and stripped.lower().startswith(skip_prefix):
             continue
 
-        unchecked = re.match(r'^(\s*)-\s\[\s\]\s(.+)$', line)
-        checked = re.match(r'^(\s*)-\s\[x\]\s(.+)$', line, re.IGNORECASE)
-
-        if unchecked:
-            items.append({'text': unchecked.group(2).strip(), 'checked': False})
-        elif checked:
-            items.append({'text': checked.group(2).strip(), 'checked': True})
-        elif line.strip():
+        m = _CHECKBOX_RE.match(line)
+        if m:
+            items.append({'text': m.group(2).strip(), 'checked': m.group(1) in 'xX'})
+        elif stripped:
             context_lines.append(line)
 
     return {'items': items, 'context_lines': context_lines}
@@ -56,20 +60,35 @@ def filter_p0p1_items(items: list[dict]) -> list[dict]:
     """
     result = []
     for item in items:
-        stripped = re.sub(r'^[\s*_\[\]]+', '', item['text'].strip()).upper()
-        if re.search(r'\bP[01]\b', stripped):
+        stripped = _PRIORITY_PREFIX_RE.sub('', item['text'].strip()).upper()
+        if _P0P1_RE.search(stripped):
             result.append(item)
     return result
 
 
 # ─── Codex Turn Detection (mirrors CodexWorkerBase.tsx) ─────────────
 
+_EVENT_TOKEN_SEP_RE = re.compile(r'[/_\s]+')
+
+_DONE_TOKENS = frozenset({
+    'agent-turn-complete', 'agent-turn-completed', 'agent-turn-done',
+    'turn-complete', 'turn-completed', 'turn-done',
+    'item-complete', 'item-completed',
+    'session-complete', 'session-completed',
+    'response-complete', 'response-completed', 'response-done',
+    'message-complete', 'message-completed', 'message-done',
+    'completion', 'completed', 'done', 'finished', 'stop', 'stopped',
+})
+_DONE_RAW_SUFFIXES = ('/complete', '/completed', '/done', '/finished')
+_DONE_TOKEN_SUFFIXES = ('-complete', '-completed', '-done', '-finished')
+_DONE_STATUSES = frozenset({'complete', 'completed', 'done', 'finished', 'stopped', 'success', 'ok'})
+
 def _normalize_event_token(value) -> str:
     """Normalize an event value to a lowercase hyphen-separated token.
     
     Mirrors: app/src/CodexWorkerBase.tsx → normalizeEventToken
     """
-    return re.sub(r'[/_\s]+', '-', str(value or '').strip().lower())
+    return _EVENT_TOKEN_SEP_RE.sub('-', str(value or '').strip().lower())
 
 
 def is_codex_turn_complete(data: dict) -> bool:
@@ -80,16 +99,6 @@ def is_codex_turn_complete(data: dict) -> bool:
     if data.get('codex_is_done') is True:
         return True
 
-    done_tokens = {
-        'agent-turn-complete', 'agent-turn-completed', 'agent-turn-done',
-        'turn-complete', 'turn-completed', 'turn-done',
-        'item-complete', 'item-completed',
-        'session-complete', 'session-completed',
-        'response-complete', 'response-completed', 'response-done',
-        'message-complete', 'message-completed', 'message-done',
-        'completion', 'completed', 'done', 'finished', 'stop', 'stopped',
-    }
-
     event_candidates = [
         data.get('codex_event_type'), data.get('event_type'), data.get('type'),
         data.get('hook_event_name'),
@@ -103,12 +112,12 @@ def is_codex_turn_complete(data: dict) -> bool:
 
     for candidate in event_candidates:
         raw = str(candidate or '').strip().lower()
-        if raw.endswith('/complete') or raw.endswith('/completed') or raw.endswith('/done') or raw.endswith('/finished'):
+        if raw.endswith(_DONE_RAW_SUFFIXES):
             return True
         token = _normalize_event_token(candidate)
         if not token:
             continue
-        if token in done_tokens or token.endswith('-complete') or token.endswith('-completed') or token.endswith('-done') or token.endswith('-finished'):
+        if token in _DONE_TOKENS or token.endswith(_DONE_TOKEN_SUFFIXES):
             return True
 
     status_candidates = [data.get('status')]
@@ -116,7 +125,7 @@ def is_codex_turn_complete(data: dict) -> bool:
         status_candidates.append(payload.get('status'))
     for status in status_candidates:
         token = _normalize_event_token(status)
-        if token in ('complete', 'completed', 'done', 'finished', 'stopped', 'success', 'ok'):
+        if token in _DONE_STATUSES:
             return True
 
     return bool(data.get('done') or data.get('complete') or
@@ -0,0 +1,585 @@
+"""
+Tests for the pure (non-UI) parts of app.py.
+
+Covers:
+  - Config cache, debounced writes and on-disk format
+  - Prompt detection for pending command callbacks (AppCoordinator._feed_callback)
+  - Routing of change/review terminal output to the session that produced it
+  - Hook notification server, including keep-alive connections
+  - Parsing of NUL-delimited `git status` and `git log` output
+  - Resolving HEAD from ref files (NativeBridgeHandler._read_head_sha)
+  - TerminalSession wake-up pipe lifecycle, queued writes and coalesced PTY reads
+
+app.py imports PyObjC at module level, so these tests are skipped where it
+isn't installed (i.e. anywhere but macOS with the app's requirements).
+"""
+
+import unittest
+import unittest.mock
+import sys
+import os
+import json
+import socket
+import selectors
+import http.client
+import threading
+import tempfile
+import time
+import shutil
+import subprocess
+import fcntl
+
+# Ensure the desktop directory is on sys.path so the test can be run from any working directory
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import app
+except ImportError:
+    app = None
+
+
+@unittest.skipIf(app is None, 'PyObjC is not available')
+class TestConfigCache(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'config.json')
+        saved = {name: getattr(app, name) for name in (
+            'CONFIG_PATH', 'CONFIG_SAVE_DELAY', '_config_cache', '_config_mtime', '_config_save_timer')}
+        self.addCleanup(lambda: [setattr(app, k, v) for k, v in saved.items()])
+        self.addCleanup(app.flush_config)
+        app.CONFIG_PATH = self.path
+        app.CONFIG_SAVE_DELAY = 0.05
+        app._config_cache = None
+        app._config_mtime = 0.0
+        app._config_save_timer = None
+
+    def write_file(self, data):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def read_file(self):
+        with open(self.path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_missing_file_loads_empty(self):
+        self.assertEqual(app.load_config(), {})
+
+    def test_load_returns_a_copy(self):
+        self.write_file({'recent': ['/a']})
+        app.load_config()['recent'].append('/b')
+        self.assertEqual(app.load_config(), {'recent': ['/a']})
+
+    def test_update_is_visible_before_flush(self):
+        app.update_config(lastDirectory='/proj')
+        self.assertEqual(app.load_config(), {'lastDirectory': '/proj'})
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_writes_are_debounced_into_one(self):
+        app.update_config(a=1)
+        app.update_config(b=2)
+        app.save_config({**app.load_config(), 'c': 3})
+        # One delayed write (atomic rename), carrying all three changes
+        deadline = time.monotonic() + 2
+        while not os.path.exists(self.path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(json.loads(self.read_file()), {'a': 1, 'b': 2, 'c': 3})
+
+    def test_unchanged_update_schedules_no_write(self):
+        self.write_file({'a': 1})
+        app.update_config(a=1)
+        self.assertIsNone(app._config_save_timer)
+
+    def test_flush_keeps_indented_format(self):
+        app.update_config(lastDirectory='/proj', sessions={'x': 1})
+        app.flush_config()
+        self.assertEqual(self.read_file(), json.dumps(
+            {'lastDirectory': '/proj', 'sessions': {'x': 1}}, indent=2))
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+
+    def test_external_edit_is_picked_up(self):
+        self.write_file({'a': 1})
+        self.assertEqual(app.load_config(), {'a': 1})
+        self.write_file({'a': 2})
+        os.utime(self.path, (0, app._config_mtime + 1))
+        self.assertEqual(app.load_config(), {'a': 2})
+
+    def test_pending_write_wins_over_file(self):
+        self.write_file({'a': 1})
+        app.update_config(a=5)
+        self.write_file({'a': 2})
+        os.utime(self.path, (0, app._config_mtime + 1))
+        self.assertEqual(app.load_config(), {'a': 5})
+
+
+@unittest.skipIf(app is None, 'PyObjC is not available')
+class TestFeedCallback(unittest.TestCase):
+
+    def setUp(self):
+        # Skip __init__ (it starts PTYs and worker threads); the prompt-detection
+        # helpers only need the callback buffer caps it would set.
+        self.coord = app.AppCoordinator.__new__(app.AppCoordinator)
+        self.coord._CB_KEEP_BYTES = 40000
+        self.coord._CB_MAX_BUFFER = 80000
+
+    def feed(self, cb_info, *chunks):
+        text_chunks = [c if isinstance(c, str) else c.decode('utf-8') for c in chunks]
+        return [self.coord._feed_callback(cb_info, t.encode('utf-8'), t) for t in text_chunks]
+
+    def test_shell_prompt_detected(self):
+        cb = self.coord.new_callback_info('shell', 'ls')
+        self.assertEqual(self.feed(cb, 'file1\r\nfile2\r\n', 'user@host ~ % '), [False, True])
+
+    def test_shell_prompt_behind_color_codes(self):
+        cb = self.coord.new_callback_info('shell', 'ls')
+        self.assertEqual(self.feed(cb, 'done\r\n\x1b[32muser\x1b[0m ~ $\x1b[0m '), [True])
+
+    def test_no_prompt_in_plain_output(self):
+        cb = self.coord.new_callback_info('shell', 'ls')
+        self.assertEqual(self.feed(cb, 'building...\r\n', 'compiled 3 files\r\n'), [False, False])
+
+    def test_droid_anchor_split_by_sgr(self):
+        # No prompt char in the chunk; the anchor only appears once escapes are stripped
+        cb = self.coord.new_callback_info('droid', 'droid')
+        self.assertEqual(self.feed(cb, 'How \x1b[1mcan\x1b[0m I help you today?\r\n'), [True])
+
+    def test_droid_anchor_across_chunks(self):
+        cb = self.coord.new_callback_info('droid', 'droid')
+        self.assertEqual(self.feed(cb, 'Welcome. How can', ' I help you?'), [False, True])
+
+    def test_escape_sequence_split_across_chunks(self):
+        cb = self.coord.new_callback_info('droid', 'droid')
+        self.assertEqual(self.feed(cb, 'How can \x1b[', '1mI\x1b[0m help'), [False, True])
+
+    def test_prompt_before_unfinished_escape(self):
+        cb = self.coord.new_callback_info('shell', 'ls')
+        self.assertEqual(self.feed(cb, 'done\r\n$ \x1b['), [True])
+
+    def test_clean_tail_strips_escapes(self):
+        self.assertEqual(self.coord._clean_tail('\x1b[31mred\x1b[0m text\r\n\x1b]0;ti'), 'red text\r\n')
+
+    def test_chunks_without_prompt_chars_are_not_stripped(self):
+        stripped = []
+        ansi_re = self.coord._ansi_re
+        self.coord._ansi_re = unittest.mock.Mock(sub=lambda repl, s: stripped.append(s) or ansi_re.sub(repl, s))
+        shell = self.coord.new_callback_info('shell', 'ls')
+        droid = self.coord.new_callback_info('droid', 'droid')
+        for cb in (shell, droid):
+            self.assertEqual(self.feed(cb, '\x1b[32mbuilding\x1b[0m\r\n', '\x1b[1mdone\x1b[0m\r\n'), [False, False])
+        self.assertEqual(stripped, [])
+        self.assertEqual(self.feed(shell, '\x1b[32m$\x1b[0m '), [True])
+        self.assertEqual(len(stripped), 1)
+
+    def test_utf8_split_before_callback_registered(self):
+        session = app.TerminalSession(shell='/bin/sh')
+        pending = {}
+        fired = []
+        on_match = lambda cb_id, output: fired.append((cb_id, output))
+        check = '✓'.encode('utf-8')
+        # The chunk ending mid-character arrives while nothing is pending
+        self.coord._process_pty_chunk(pending, session, b'ok ' + check[:2], on_match)
+        cb = pending['cb1'] = self.coord.new_callback_info('shell', 'ls')
+        self.coord._process_pty_chunk(pending, session, check[2:] + b' done\r\n$ ', on_match)
+        self.assertEqual([cb_id for cb_id, _ in fired], ['cb1'])
+        self.assertEqual(pending, {})
+        # The decoder completed the character instead of emitting a replacement
+        self.assertEqual(self.coord._clean_tail(cb['raw_tail']), '✓ done\r\n$ ')
+
+    def test_buffer_keeps_raw_output(self):
+        cb = self.coord.new_callback_info('shell', 'ls')
+        self.feed(cb, '\x1b[31mred\x1b[0m\r\n', '$ ')
+        self.assertEqual(bytes(cb['buffer']), b'\x1b[31mred\x1b[0m\r\n$ ')
+
+
+@unittest.skipIf(app is None, 'PyObjC is not available')
+class TestTerminalOutputRouting(unittest.TestCase):
+
+    def setUp(self):
+        # Skip __init__; only the state the output handlers touch is set up
+        self.coord = app.AppCoordinator.__new__(app.AppCoordinator)
+        self.coord._CB_KEEP_BYTES = 40000
+        self.coord._CB_MAX_BUFFER = 80000
+        self.coord.webview = object()
+        self.coord.log_textview = None
+        self.coord.change_terminals = {}
+        self.coord._change_pending_callbacks = {}
+        self.coord._change_output_js_templates = {}
+        self.coord._review_pending_callbacks = {}
+        self.coord._queue_terminal_output = lambda js_template, data: None
+        self.fired = []
+        self.coord._fire_change_callback = lambda tab_id, cb_id, output: self.fired.append(cb_id)
+        self.coord._fire_review_callback = lambda cb_id, output: self.fired.append(cb_id)
+
+    def eager_session(self, first_output=b''):
+        """A session whose reader delivers output before start() returns, without a real PTY."""
+        class EagerSession(app.TerminalSession):
+            def start(self, cols=80, rows=24):
+                self._started = True
+                self.on_output(first_output)
+        patcher = unittest.mock.patch.object(app, 'TerminalSession', EagerSession)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_change_output_during_start_reaches_decoder(self):
+        check = '✓'.encode('utf-8')
+        self.eager_session(b'ok ' + check[:2])
+        self.coord.start_change_terminal('t1')
+        session = self.coord.change_terminals['t1']
+        cb = self.coord._change_pending_callbacks['t1']['cb1'] = self.coord.new_callback_info('shell', 'ls')
+        session.on_output(check[2:] + b' done\r\n$ ')
+        self.assertEqual(self.fired, ['cb1'])
+        self.assertEqual(self.coord._clean_tail(cb['raw_tail']), '✓ done\r\n$ ')
+
+    def test_replaced_change_session_does_not_fire_new_callbacks(self):
+        self.eager_session()
+        self.coord.start_change_terminal('t1')
+        old = self.coord.change_terminals.pop('t1')
+        self.coord.start_change_terminal('t1')
+        self.coord._change_pending_callbacks['t1']['cb1'] = self.coord.new_callback_info('shell', 'ls')
+        old.on_output(b'$ ')
+        self.assertEqual(self.fired, [])
+
+    def test_replaced_review_session_does_not_fire_new_callbacks(self):
+        self.eager_session()
+        self.coord.review_terminal = app.TerminalSession()
+        self.coord.start_review_terminal()
+        old = self.coord.review_terminal
+        self.coord.review_terminal = app.TerminalSession()
+        self.coord._review_pending_callbacks['cb1'] = self.coord.new_callback_info('shell', 'ls')
+        old.on_output(b'$ ')
+        self.assertEqual(self.fired, [])
+        self.coord.start_review_terminal()
+        self.coord.review_terminal.on_output(b'$ ')
+        self.assertEqual(self.fired, ['cb1'])
+
+
+class _RecordingCoordinator:
+    def __init__(self):
+        self.notifications = []
+
+    def notify_web_refresh(self, data):
+        self.notifications.append(data)
+
+
+@unittest.skipIf(app is None, 'PyObjC is not available')
+class TestHookServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            cls.port = s.getsockname()[1]
+        cls.coordinator = _RecordingCoordinator()
+        # Daemon thread; it goes away with the test process
+        cls.server = app.start_http_server(cls.coordinator, port=cls.port)
+
+    def setUp(self):
+        self.coordinator.notifications.clear()
+        self.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=2)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def post(self, path, body: bytes):
+        self.conn.request('POST', path, body=body, headers={'Content-Type': 'application/json'})
+        resp = self.conn.getresponse()
+        return resp.status, resp.read()
+
+    def test_notification_delivered(self):
+        status, body = self.post('/api/hook-notify', json.dumps({'event': 'SessionEnd'}).encode())
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), {'status': 'ok'})
+        self.assertEqual(self.coordinator.notifications, [{'event': 'SessionEnd'}])
+
+    def test_utf8_body(self):
+        payload = {'last_result': '修复完成 ✓'}
+        status, _ = self.post('/api/hook-notify', json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+        self.assertEqual(status, 200)
+        self.assertEqual(self.coordinator.notifications, [payload])
+
+    def test_empty_body(self):
+        status, _ = self.post('/api/hook-notify', b'')
+        self.assertEqual(status, 200)
+        self.assertEqual(self.coordinator.notifications, [{}])
+
+    def test_keep_alive_reuses_connection(self):
+        self.assertEqual(self.post('/api/hook-notify', b'{"n": 1}')[0], 200)
+        sock = self.conn.sock
+        self.assertEqual(self.post('/api/hook-notify', b'{"n": 2}')[0], 200)
+        self.assertIs(self.conn.sock, sock)
+        self.assertEqual(self.coordinator.notifications, [{'n': 1}, {'n': 2}])
+
+    def test_unknown_path_body_does_not_leak_into_next_request(self):
+        self.assertEqual(self.post('/elsewhere', b'{}'), (404, b''))
+        self.assertEqual(self.post('/api/hook-notify', b'{"n": 1}')[0], 200)
+        self.assertEqual(self.coordinator.notifications, [{'n': 1}])
+
+    def test_bad_json_keeps_connection_usable(self):
+        self.assertEqual(self.post('/api/hook-notify', b'not json')[0], 500)
+        self.assertEqual(self.post('/api/hook-notify', b'{"n": 1}')[0], 200)
+        self.assertEqual(self.coordinator.notifications, [{'n': 1}])
+
+
+@unittest.skipIf(app is None, 'PyObjC is not available')
+class TestTerminalSessionLifecycle(unittest.TestCase):
+
+    def test_never_started_holds_no_fds(self):
+        session = app.TerminalSession(shell='/bin/sh')
+        self.assertIsNone(session._shutdown_r)
+        self.assertIsNone(session._sel)
+        session.kill()
+        session.close()
+        session.close()
+
+    def test_kill_releases_pipe_after_reader_exits(self):
+        session = app.TerminalSession(shell='/bin/sh')
+        exited = threading.Event()
+        session.on_exit = lambda code: exited.set()
+        session.start(80, 24)
+        self.addCleanup(lambda: session.master_fd is not None and os.close(session.master_fd))
+        shutdown_fds = (session._shutdown_r, session._shutdown_w)
+        self.assertNotIn(None, shutdown_fds)
+        session.kill()
+        self.assertTrue(exited.wait(5))
+        session._reader.join(5)
+        self.assertIsNone(session._shutdown_w)
+        self.assertIsNone(session._sel)
+        for fd in shutdown_fds:
+            with self.assertRaises(OSError):
+                os.fstat(fd)
+        # Late kill()/close() after the reader is gone must not touch stale fds
+        session.kill()
+        session.close()
+
+
+@unittest.skipIf(app is None, 'PyObjC is not available')
+class TestQueuedWrites(unittest.TestCase):
+
+    def setUp(self):
+        # A non-blocking pipe stands in for the PTY master; the test reads the other end
+        r, w = os.pipe()
+        self.addCleanup(os.close, r)
+        self.addCleanup(os.close, w)
+        flags = fcntl.fcntl(w, fcntl.F_GETFL)
+        fcntl.fcntl(w, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+        self.read_fd = r
+        self.session = app.TerminalSession(shell='/bin/sh')
+        self.session.master_fd = w
+        self.session._alive = True
+        self.session._writer = threading.Thread(target=self.session._write_loop, daemon=True)
+        self.session._writer.start()
+        self.addCleanup(self.stop)
+
+    def stop(self):
+        self.session._alive = False
+        self.session._wake_writer()
+        self.session._writer.join(5)
+
+    def fill_pipe(self) -> int:
+        filled = 0
+        try:
+            while True:
+                filled += os.write(self.session.master_fd, b'f' * 4096)
+        except BlockingIOError:
+            return filled
+
+    def read_exactly(self, n: int) -> bytes:
+        out = bytearray()
+        while len(out) < n:
+            out += os.read(self.read_fd, n - len(out))
+        return bytes(out)
+
+    def test_write_does_not_block_on_full_pty(self):
+        filled = self.fill_pipe()
+        payload = bytes(range(256)) * 400
+        start = time.monotonic()
+        self.session.write(b'\x1b[200~')
+        self.session.write(payload)
+        self.session.write(b'\x1b[201~')
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.read_exactly(filled)
+        self.assertEqual(self.read_exactly(len(payload) + 12), b'\x1b[200~' + payload + b'\x1b[201~')
+
+    def test_full_pty_is_waited_on_not_dropped(self):
+        self.session._PTY_WRITE_POLL = 0.05
+        filled = self.fill_pipe()
+        self.session.write(b'late input')
+        time.sleep(0.3)  # several poll intervals with no room
+        self.read_exactly(filled)
+        self.assertEqual(self.read_exactly(10), b'late input')
+
+    def test_writer_exits_when_session_dies(self):
+        self.fill_pipe()
+        self.session.write(b'x' * 1000)
+        self.stop()
+        self.assertFalse(self.session._writer.is_alive())
+        self.session.write(b'ignored')
+        self.assertEqual(len(self.session._write_queue), 0)
+
+
+@unittest.skipIf(app is None, 'PyObjC is not available')
+class TestReadCoalesced(unittest.TestCase):
+
+    def setUp(self):
+        # A plain pipe stands in for the PTY master
+        self.session = app.TerminalSession(shell='/bin/sh')
+        r, w = os.pipe()
+        self.addCleanup(os.close, r)
+        self.addCleanup(os.close, w)
+        self.write_fd = w
+        self.session.master_fd = r
+        self.session._sel = selectors.DefaultSelector()
+        self.addCleanup(self.session._sel.close)
+        self.session._sel.register(r, selectors.EVENT_READ)
+
+    def test_single_read(self):
+        os.write(self.write_fd, b'hello')
+        self.assertEqual(self.session._read_coalesced(), b'hello')
+
+    def test_drains_queued_output_across_reads(self):
+        payload = bytes(range(256)) * 600  # larger than the 64KB read buffer
+        threading.Thread(target=os.write, args=(self.write_fd, payload), daemon=True).start()
+        received = b''
+        while len(received) < len(payload):
+            received += self.session._read_coalesced()
+        self.assertEqual(received, payload)
+
+@unittest.skipIf(app is None, 'PyObjC is not available')
+class TestParseGitStatus(unittest.TestCase):
+
+    def parse(self, stdout):
+        return app.NativeBridgeHandler._parse_status_z(stdout)
+
+    def test_entries_and_tracking_branch(self):
+        branch, files = self.parse(
+            b'## main...origin/main [ahead 1]\x00'
+            b'M  staged.txt\x00'
+            b' M edited.txt\x00'
+            b'?? new.txt\x00')
+        self.assertEqual(branch, 'main')
+        self.assertEqual(files, [
+            {'index': 'M', 'working': ' ', 'path': 'staged.txt'},
+            {'index': ' ', 'working': 'M', 'path': 'edited.txt'},
+            {'index': '?', 'working': '?', 'path': 'new.txt'},
+        ])
+
+    def test_rename_source_entry_is_skipped(self):
+        _, files = self.parse(b'## main\x00R  new name.txt\x00old name.txt\x00 M after.txt\x00')
+        self.assertEqual([f['path'] for f in files], ['new name.txt', 'after.txt'])
+
+    def test_paths_are_not_quoted(self):
+        _, files = self.parse(b'## main\x00?? dir/line\nbreak "q".txt\x00?? caf\xc3\xa9.txt\x00')
+        self.assertEqual([f['path'] for f in files], ['dir/line\nbreak "q".txt', 'café.txt'])
+
+    def test_invalid_utf8_path_is_replaced(self):
+        _, files = self.parse(b'## main\x00 M caf\xe9.txt\x00')
+        self.assertEqual(files[0]['path'], 'caf\ufffd.txt')
+
+    def test_branch_headers(self):
+        self.assertEqual(self.parse(b'## No commits yet on trunk\x00'), ('trunk', []))
+        self.assertEqual(self.parse(b'## HEAD (no branch)\x00'), ('', []))
+        self.assertEqual(self.parse(b'## feature/x\x00'), ('feature/x', []))
+
+    def test_empty_output(self):
+        self.assertEqual(self.parse(b''), ('', []))
+
+
+@unittest.skipIf(app is None, 'PyObjC is not available')
+class TestParseGitLog(unittest.TestCase):
+
+    def parse(self, stdout):
+        return app.NativeBridgeHandler._parse_log_z(stdout)
+
+    def test_fields_per_commit(self):
+        a, b = 'a' * 40, 'b' * 40
+        commits = self.parse(
+            f'{a}\x00aaaaaaa\x00Ann\x00ann@x.io\x001700000000\x00Second\x00'
+            f'{b}\x00bbbbbbb\x00Bo\x00bo@x.io\x001600000000\x00First'.encode())
+        self.assertEqual(commits, [
+            {'hash': a, 'shortHash': 'aaaaaaa', 'author': 'Ann', 'email': 'ann@x.io',
+             'timestamp': 1700000000, 'message': 'Second'},
+            {'hash': b, 'shortHash': 'bbbbbbb', 'author': 'Bo', 'email': 'bo@x.io',
+             'timestamp': 1600000000, 'message': 'First'},
+        ])
+
+    def test_text_fields_decode_utf8(self):
+        [commit] = self.parse(('c' * 40 + '\x00ccccccc\x00José\x00j@x.io\x001\x00修复 | fix').encode())
+        self.assertEqual((commit['author'], commit['message']), ('José', '修复 | fix'))
+
+    def test_empty_history(self):
+        self.assertEqual(self.parse(b''), [])
+
+    @unittest.skipIf(shutil.which('git') is None, 'git is not installed')
+    def test_real_git_output(self):
+        with tempfile.TemporaryDirectory() as repo:
+            def git(*args):
+                return subprocess.run(['git', '-c', 'user.name=Tést', '-c', 'user.email=t@x.io', *args],
+                                      cwd=repo, capture_output=True, check=True).stdout
+            git('init', '-q')
+            for subject in ('first', 'second: with\ttab'):
+                git('commit', '-q', '--allow-empty', '-m', subject)
+            out = git('log', '-2', '-z', '--pretty=format:%H%x00%h%x00%an%x00%ae%x00%at%x00%s')
+            commits = self.parse(out)
+        self.assertEqual([c['message'] for c in commits], ['second: with\ttab', 'first'])
+        self.assertEqual({c['author'] for c in commits}, {'Tést'})
+        self.assertTrue(all(len(c['hash']) in (40, 64) for c in commits))
+
+
+@unittest.skipIf(app is None, 'PyObjC is not available')
+@unittest.skipIf(shutil.which('git') is None, 'git is not installed')
+class TestReadHeadSha(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.repo = tmp.name
+        self.git('init', '-q')
+
+    def git(self, *args):
+        r = subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@x.io', *args],
+                           cwd=self.repo, capture_output=True, text=True, check=True)
+        return r.stdout.strip()
+
+    def read(self, path=None):
+        return app.NativeBridgeHandler._read_head_sha(path or self.repo)
+
+    def commit(self):
+        self.git('commit', '-q', '--allow-empty', '-m', 'c')
+        return self.git('rev-parse', 'HEAD')
+
+    def test_unborn_branch(self):
+        self.assertEqual(self.read(), '')
+
+    def test_loose_ref(self):
+        sha = self.commit()
+        self.assertEqual(self.read(), sha)
+
+    def test_packed_ref(self):
+        sha = self.commit()
+        self.git('pack-refs', '--all')
+        self.assertEqual(self.read(), sha)
+
+    def test_loose_ref_wins_over_packed(self):
+        self.commit()
+        self.git('pack-refs', '--all')
+        sha = self.commit()
+        self.assertEqual(self.read(), sha)
+
+    def test_detached_head(self):
+        sha = self.commit()
+        self.commit()
+        self.git('checkout', '-q', '--detach', sha)
+        self.assertEqual(self.read(), sha)
+
+    def test_subdirectory_and_non_repo(self):
+        self.commit()
+        sub = os.path.join(self.repo, 'sub')
+        os.mkdir(sub)
+        self.assertEqual(self.read(sub), '')
+        with tempfile.TemporaryDirectory() as other:
+            self.assertEqual(self.read(other), '')
+
+
+if __name__ == '__main__':
+    unittest.main()